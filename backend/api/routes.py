@@ -3,13 +3,20 @@ REST API routes for BGCS entity management and simulation control.
 Provides endpoints for spawning, controlling, and managing entities.
 """
 
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+import functools
+from operator import attrgetter
+from pydantic import BaseModel, ConfigDict, Field
+import asyncio
+import itertools
 import logging
+import orjson
 import time
+from uuid import uuid4
 
-from ..entities.base import Vector3
+from ..entities.base import Vector3, path_triples
 from ..state.manager import state_manager
 from ..simulation.engine import SimulationEngine
 
@@ -19,15 +26,23 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["BGCS API"])
 
 # Pydantic models for request/response validation
+# Models are never mutated after validation; response models are only built
+# by this module, so unknown fields there are a bug rather than client input.
+REQUEST_MODEL_CONFIG = ConfigDict(frozen=True)
+RESPONSE_MODEL_CONFIG = ConfigDict(frozen=True, extra="forbid")
 
 class Position(BaseModel):
     """3D position model."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     x: float = Field(..., description="X coordinate in meters")
     y: float = Field(..., description="Y coordinate in meters") 
     z: float = Field(..., description="Z coordinate in meters")
 
 class SpawnRequest(BaseModel):
     """Request model for spawning entities."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     type: str = Field(..., description="Entity type (drone, target)")
     id: Optional[str] = Field(None, description="Optional entity ID")
     position: Position = Field(..., description="Spawn position")
@@ -35,41 +50,81 @@ class SpawnRequest(BaseModel):
 
 class ModeRequest(BaseModel):
     """Request model for changing entity mode."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     mode: str = Field(..., description="New entity mode")
 
 class PathRequest(BaseModel):
     """Request model for setting entity path."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     path: List[Position] = Field(..., description="List of waypoint positions")
     replace: bool = Field(True, description="Replace existing path or append")
 
 class GroupRequest(BaseModel):
     """Request model for creating entity groups."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     name: str = Field(..., description="Group name")
     members: List[str] = Field(..., description="List of entity IDs")
 
 class GroupUpdateRequest(BaseModel):
     """Request model for updating entity groups."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     name: Optional[str] = Field(None, description="New group name")
     members: Optional[List[str]] = Field(None, description="New list of entity IDs")
 
+class SelectionRequest(BaseModel):
+    """Request model for replacing the entity selection."""
+    model_config = REQUEST_MODEL_CONFIG
+    
+    ids: List[str] = Field(..., description="List of entity IDs to select")
+
 class OrderRequest(BaseModel):
     """Request model for reordering entities or groups."""
+    model_config = REQUEST_MODEL_CONFIG
+    
     ordered_ids: List[str] = Field(..., description="List of IDs in desired order")
 
 class StatusResponse(BaseModel):
     """Response model for status information."""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     success: bool
     message: str
-    data: Optional[Dict[str, Any]] = None
+    data: Optional[dict] = None
 
 class EntityResponse(BaseModel):
     """Response model for entity information."""
+    model_config = RESPONSE_MODEL_CONFIG
+    
     id: str
     type: str
     position: Position
     status: str
     properties: Dict[str, Any]
 
+def handle_api_errors(log_message: str, detail: str = "Internal server error"):
+    """
+    Wrap a route so unexpected exceptions are logged and returned as HTTP 500.
+    
+    HTTP errors raised by the handler pass through unchanged.
+    log_message is formatted with the route's keyword arguments (e.g. {entity_id}).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"{log_message.format(**kwargs)}: {e}")
+                raise HTTPException(status_code=500, detail=detail)
+        return wrapper
+    return decorator
+
 # Global references (set in main.py)
 connection_manager = None
 simulation_engine = None
@@ -84,25 +139,106 @@ def set_simulation_engine(engine):
     global simulation_engine
     simulation_engine = engine
 
-async def broadcast_update(message_type: str, data: Dict[str, Any]):
-    """Broadcast update to all connected WebSocket clients."""
+# Broadcast types that carry the full latest state of one entity/group, mapped
+# to the data field identifying it. Only the newest payload per key matters.
+COALESCED_BROADCASTS = {
+    "entity_mode_changed": "entity_id",
+    "group_updated": "id"
+}
+
+class BroadcastCoalescer:
+    """
+    Ordered background queue for WebSocket broadcasts.
+    
+    Handlers enqueue and return immediately; a single flush task fans messages
+    out in order. Repeated state broadcasts for the same key that are still
+    pending collapse into the newest one, which moves to the back of the queue
+    so it is never delivered ahead of messages queued before it.
+    """
+    
+    def __init__(self):
+        self.pending: Dict[tuple, Dict[str, Any]] = {}
+        self.flush_task: Optional[asyncio.Task] = None
+        self.sequence = itertools.count()
+    
+    def schedule(self, key: Optional[tuple], message: Dict[str, Any]) -> None:
+        """Queue message, replacing any pending message with the same key (None never coalesces)."""
+        if key is None:
+            key = (None, next(self.sequence))
+        else:
+            self.pending.pop(key, None)  # re-queue at the end to keep send order
+        self.pending[key] = message
+        if self.flush_task is None:
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush())
+    
+    async def flush(self) -> None:
+        """Send pending messages in the order they were (last) queued."""
+        try:
+            while self.pending:
+                pending = self.pending
+                self.pending = {}
+                if not connection_manager:
+                    continue
+                for message in pending.values():
+                    try:
+                        await connection_manager.broadcast(message)
+                    except Exception as e:
+                        logger.error(f"Error broadcasting {message.get('type')}: {e}")
+        finally:
+            self.flush_task = None
+
+broadcast_coalescer = BroadcastCoalescer()
+
+def broadcast_update(message_type: str, data: Dict[str, Any]) -> None:
+    """Queue an update for all connected WebSocket clients without waiting on the fanout."""
     if connection_manager:
-        await connection_manager.broadcast({
+        message = {
             "type": message_type,
             "timestamp": state_manager.simulation_time,
             "data": data
-        })
+        }
+        
+        key_field = COALESCED_BROADCASTS.get(message_type)
+        key = (message_type, data.get(key_field)) if key_field is not None else None
+        broadcast_coalescer.schedule(key, message)
 
 # Simulation Control Endpoints
+# Starlette matches routes in registration order, so the polled read endpoints
+# (/status, /state, /entities) are registered first.
+
+# Last encoded /status body, keyed by its ETag
+_status_cache: Optional[Tuple[str, bytes]] = None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (comma-separated list or *) using weak comparison."""
+    if not if_none_match:
+        return False
+    opaque_tag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque_tag:
+            return True
+    return False
 
 @router.get("/status")
-async def get_system_status():
-    """Get comprehensive system status."""
-    try:
+@handle_api_errors("Error getting system status", detail="Failed to get system status")
+async def get_system_status(raw_request: Request):
+    """Get comprehensive system status (supports If-None-Match via a weak revision ETag)."""
+    global _status_cache
+    
+    etag = f'W/"rev-{state_manager.revision}-{simulation_engine.stats_revision}"'
+    if etag_matches(raw_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    if _status_cache is None or _status_cache[0] != etag:
         performance_stats = simulation_engine.get_performance_stats()
         entity_counts = state_manager.get_entity_count_by_type()
         
-        return {
+        _status_cache = (etag, orjson.dumps({
             "status": "running",
             "simulation": performance_stats,
             "entities": {
@@ -112,548 +248,482 @@ async def get_system_status():
             },
             "events": len(state_manager.events),
             "messages": len(state_manager.chat_messages)
-        }
-    except Exception as e:
-        logger.error(f"Error getting system status: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get system status")
+        }))
+    
+    return Response(content=_status_cache[1], media_type="application/json", headers={"ETag": etag})
 
 @router.get("/state")
+@handle_api_errors("Error getting simulation state", detail="Failed to get simulation state")
 async def get_simulation_state():
     """Get complete simulation state snapshot."""
-    try:
-        snapshot = state_manager.get_state_snapshot()
-        return {
-            "success": True,
-            "state": snapshot
-        }
-    except Exception as e:
-        logger.error(f"Error getting simulation state: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get simulation state")
+    # Splice the cached snapshot encoding into the envelope instead of re-serializing
+    snapshot_json = state_manager.get_state_snapshot_json()
+    return Response(
+        content=b'{"success":true,"state":' + snapshot_json + b'}',
+        media_type="application/json"
+    )
 
 # Entity Management Endpoints
 
+# Fetches every field list_entities needs in a single C-level call per entity
+_entity_summary_fields = attrgetter(
+    "id", "entity_type", "position.x", "position.y", "position.z", "destroyed",
+    "health", "detected", "selected", "current_mode", "sort_index"
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def iter_entity_summaries(entities) -> Iterator[Dict[str, Any]]:
+    """Yield plain dicts in the EntityResponse shape for the given entities."""
+    # Skipping per-entity model construction avoids re-running validation on every poll
+    return (
+        {
+            "id": entity_id,
+            "type": entity_type,
+            "position": {"x": x, "y": y, "z": z},
+            "status": "destroyed" if destroyed else "active",
+            "properties": {
+                "health": health,
+                "detected": detected,
+                "selected": selected,
+                "current_mode": current_mode,
+                "sort_index": sort_index
+            }
+        }
+        for (entity_id, entity_type, x, y, z, destroyed, health,
+             detected, selected, current_mode, sort_index)
+        in map(_entity_summary_fields, entities)
+    )
+
+@router.get("/entities", response_model=None, responses={
+    200: {"model": List[EntityResponse], "content": {NDJSON_MEDIA_TYPE: {}}}
+})
+@handle_api_errors("Error listing entities", detail="Failed to list entities")
+async def list_entities(raw_request: Request):
+    """Get list of all entities (one JSON object per line if NDJSON is accepted)."""
+    entities = list(state_manager.entities.values())
+    
+    if NDJSON_MEDIA_TYPE in raw_request.headers.get("accept", ""):
+        async def stream_entities():
+            for summary in iter_entity_summaries(entities):
+                yield orjson.dumps(summary) + b"\n"
+        
+        return StreamingResponse(stream_entities(), media_type=NDJSON_MEDIA_TYPE)
+    
+    return ORJSONResponse(content=list(iter_entity_summaries(entities)))
+
 @router.post("/spawn", response_model=StatusResponse)
+@handle_api_errors("Error spawning entity")
 async def spawn_entity(request: SpawnRequest):
     """Spawn a new entity in the simulation."""
-    try:
-        # Validate entity type
-        if request.type not in ["drone", "target"]:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid entity type: {request.type}. Must be 'drone' or 'target'"
-            )
-        
-        # Create position vector
-        position = Vector3(request.position.x, request.position.y, request.position.z)
-        
-        # Spawn entity
-        success = simulation_engine.spawn_entity(
-            request.type,
-            request.id,
-            position,
-            **request.properties
+    # Validate entity type
+    if request.type not in ["drone", "target"]:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid entity type: {request.type}. Must be 'drone' or 'target'"
         )
+    
+    # Create position vector
+    position = Vector3(request.position.x, request.position.y, request.position.z)
+    
+    # Spawn entity
+    success = simulation_engine.spawn_entity(
+        request.type,
+        request.id,
+        position,
+        **request.properties
+    )
+    
+    if success:
+        # Broadcast spawn event
+        broadcast_update("entity_spawned", {
+            "entity_type": request.type,
+            "entity_id": request.id,
+            "position": {"x": position.x, "y": position.y, "z": position.z},
+            "properties": request.properties
+        })
         
-        if success:
-            # Broadcast spawn event
-            await broadcast_update("entity_spawned", {
-                "entity_type": request.type,
-                "entity_id": request.id,
-                "position": {"x": position.x, "y": position.y, "z": position.z},
-                "properties": request.properties
-            })
-            
-            return StatusResponse(
-                success=True,
-                message=f"Successfully spawned {request.type}",
-                data={"entity_id": request.id, "type": request.type}
-            )
-        else:
-            raise HTTPException(status_code=400, detail="Failed to spawn entity")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error spawning entity: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-
-@router.get("/entities", response_model=List[EntityResponse])
-async def list_entities():
-    """Get list of all entities."""
-    try:
-        entities = []
-        for entity_id, entity in state_manager.entities.items():
-            entities.append(EntityResponse(
-                id=entity.id,
-                type=entity.entity_type,
-                position=Position(x=entity.position.x, y=entity.position.y, z=entity.position.z),
-                status="destroyed" if entity.destroyed else "active",
-                properties={
-                    "health": entity.health,
-                    "detected": entity.detected,
-                    "selected": entity.selected,
-                    "current_mode": getattr(entity, 'current_mode', 'unknown'),
-                    "sort_index": entity.sort_index
-                }
-            ))
-        
-        return entities
-        
-    except Exception as e:
-        logger.error(f"Error listing entities: {e}")
-        raise HTTPException(status_code=500, detail="Failed to list entities")
+        return StatusResponse(
+            success=True,
+            message=f"Successfully spawned {request.type}",
+            data={"entity_id": request.id, "type": request.type}
+        )
+    else:
+        raise HTTPException(status_code=400, detail="Failed to spawn entity")
 
 @router.get("/entity/{entity_id}")
+@handle_api_errors("Error getting entity {entity_id}")
 async def get_entity(entity_id: str):
     """Get detailed information about a specific entity."""
-    try:
-        entity = state_manager.get_entity(entity_id)
-        if not entity:
-            raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-        
-        # Get entity data
-        entity_data = entity.to_dict()
-        
-        return {
-            "success": True,
-            "entity": entity_data
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting entity {entity_id}: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    entity = state_manager.get_entity(entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
+    
+    # Get entity data
+    entity_data = entity.to_dict()
+    
+    return {
+        "success": True,
+        "entity": entity_data
+    }
 
 @router.put("/entity/{entity_id}/mode", response_model=StatusResponse)
+@handle_api_errors("Error setting entity mode")
 async def set_entity_mode(entity_id: str, request: ModeRequest):
     """Set entity behavior mode."""
-    try:
-        entity = state_manager.get_entity(entity_id)
-        if not entity:
-            raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-        
-        # Check if entity supports mode setting
-        if hasattr(entity, 'set_mode'):
-            success = entity.set_mode(request.mode)
-            if success:
-                # Log mode change event
-                state_manager.log_event("mode_changed", entity_id, {
-                    "old_mode": getattr(entity, 'current_mode', 'unknown'),
-                    "new_mode": request.mode
-                })
-                
-                # Broadcast mode change
-                await broadcast_update("entity_mode_changed", {
-                    "entity_id": entity_id,
-                    "mode": request.mode
-                })
-                
-                return StatusResponse(
-                    success=True,
-                    message=f"Mode set to {request.mode}",
-                    data={"entity_id": entity_id, "mode": request.mode}
-                )
-            else:
-                raise HTTPException(status_code=400, detail=f"Invalid mode: {request.mode}")
-        else:
-            raise HTTPException(status_code=400, detail="Entity does not support mode changes")
+    entity = state_manager.get_entity(entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
+    
+    # Check if entity supports mode setting
+    if hasattr(entity, 'set_mode'):
+        success = entity.set_mode(request.mode)
+        if success:
+            # Log mode change event
+            state_manager.log_event("mode_changed", entity_id, {
+                "old_mode": getattr(entity, 'current_mode', 'unknown'),
+                "new_mode": request.mode
+            })
             
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error setting entity mode: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+            # Broadcast mode change
+            broadcast_update("entity_mode_changed", {
+                "entity_id": entity_id,
+                "mode": request.mode
+            })
+            
+            return StatusResponse(
+                success=True,
+                message=f"Mode set to {request.mode}",
+                data={"entity_id": entity_id, "mode": request.mode}
+            )
+        else:
+            raise HTTPException(status_code=400, detail=f"Invalid mode: {request.mode}")
+    else:
+        raise HTTPException(status_code=400, detail="Entity does not support mode changes")
 
 @router.put("/entity/{entity_id}/path", response_model=StatusResponse)
+@handle_api_errors("Error setting entity path")
 async def set_entity_path(entity_id: str, request: PathRequest):
     """Set entity waypoint path."""
-    try:
-        entity = state_manager.get_entity(entity_id)
-        if not entity:
-            raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-        
-        # Clear existing waypoints if replacing
-        if request.replace:
-            entity.clear_waypoints()
-        
-        # Add waypoints
-        waypoints_added = 0
-        for pos in request.path:
-            waypoint = Vector3(pos.x, pos.y, pos.z)
-            entity.add_waypoint(waypoint)
-            waypoints_added += 1
-        
-        # Switch to waypoint mode if waypoints were added
-        if waypoints_added > 0 and hasattr(entity, 'set_mode'):
-            entity.set_mode("waypoint_mode")
-        
-        # Log path change event
-        state_manager.log_event("path_changed", entity_id, {
-            "waypoints_added": waypoints_added,
-            "total_waypoints": len(entity.waypoints),
-            "replace": request.replace
-        })
-        
-        # Broadcast path change
-        await broadcast_update("entity_path_changed", {
+    entity = state_manager.get_entity(entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
+    
+    # Clear existing waypoints if replacing
+    if request.replace:
+        entity.clear_waypoints()
+    
+    # Add waypoints
+    waypoints = [Vector3(pos.x, pos.y, pos.z) for pos in request.path]
+    entity.add_waypoints(waypoints)
+    waypoints_added = len(waypoints)
+    
+    # Switch to waypoint mode if waypoints were added
+    if waypoints_added > 0 and hasattr(entity, 'set_mode'):
+        entity.set_mode("waypoint_mode")
+    
+    # Log path change event
+    state_manager.log_event("path_changed", entity_id, {
+        "waypoints_added": waypoints_added,
+        "total_waypoints": len(entity.waypoints),
+        "replace": request.replace
+    })
+    
+    # Broadcast path change
+    broadcast_update("entity_path_changed", {
+        "entity_id": entity_id,
+        "path": path_triples(waypoints),
+        "waypoints_count": len(entity.waypoints)
+    })
+    
+    return StatusResponse(
+        success=True,
+        message=f"Path set with {waypoints_added} waypoints",
+        data={"entity_id": entity_id, "waypoints": waypoints_added}
+    )
+
+@router.delete("/entity/{entity_id}", response_model=StatusResponse)
+@handle_api_errors("Error deleting entity")
+async def delete_entity(entity_id: str):
+    """Delete an entity from the simulation."""
+    entity = state_manager.get_entity(entity_id)
+    if not entity:
+        raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
+    
+    # Use simulation engine to properly destroy entity
+    success = simulation_engine.destroy_entity(entity_id)
+    
+    if success:
+        # Broadcast deletion
+        broadcast_update("entity_deleted", {
             "entity_id": entity_id,
-            "path": [{"x": p.x, "y": p.y, "z": p.z} for p in request.path],
-            "waypoints_count": len(entity.waypoints)
+            "entity_type": entity.entity_type
         })
         
         return StatusResponse(
             success=True,
-            message=f"Path set with {waypoints_added} waypoints",
-            data={"entity_id": entity_id, "waypoints": waypoints_added}
+            message=f"Entity {entity_id} deleted successfully",
+            data={"entity_id": entity_id}
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error setting entity path: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-
-@router.delete("/entity/{entity_id}", response_model=StatusResponse)
-async def delete_entity(entity_id: str):
-    """Delete an entity from the simulation."""
-    try:
-        entity = state_manager.get_entity(entity_id)
-        if not entity:
-            raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-        
-        # Use simulation engine to properly destroy entity
-        success = simulation_engine.destroy_entity(entity_id)
-        
-        if success:
-            # Broadcast deletion
-            await broadcast_update("entity_deleted", {
-                "entity_id": entity_id,
-                "entity_type": entity.entity_type
-            })
-            
-            return StatusResponse(
-                success=True,
-                message=f"Entity {entity_id} deleted successfully",
-                data={"entity_id": entity_id}
-            )
-        else:
-            raise HTTPException(status_code=500, detail="Failed to delete entity")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting entity: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    else:
+        raise HTTPException(status_code=500, detail="Failed to delete entity")
 
 # Selection Management
 
 @router.post("/entity/{entity_id}/select", response_model=StatusResponse)
+@handle_api_errors("Error selecting entity")
 async def select_entity(entity_id: str):
     """Select an entity."""
-    try:
-        success = state_manager.select_entity(entity_id)
-        if success:
-            await broadcast_update("entity_selected", {
-                "entity_id": entity_id,
-                "selected_count": len(state_manager.selected_entities)
-            })
-            
-            return StatusResponse(
-                success=True,
-                message=f"Entity {entity_id} selected",
-                data={"entity_id": entity_id}
-            )
-        else:
-            raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error selecting entity: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    success = state_manager.select_entity(entity_id)
+    if success:
+        broadcast_update("entity_selected", {
+            "entity_id": entity_id,
+            "selected_count": len(state_manager.selected_entities)
+        })
+        
+        return StatusResponse(
+            success=True,
+            message=f"Entity {entity_id} selected",
+            data={"entity_id": entity_id}
+        )
+    else:
+        raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
 
 @router.post("/entity/{entity_id}/deselect", response_model=StatusResponse)
+@handle_api_errors("Error deselecting entity")
 async def deselect_entity(entity_id: str):
     """Deselect an entity."""
-    try:
-        success = state_manager.deselect_entity(entity_id)
-        if success:
-            await broadcast_update("entity_deselected", {
-                "entity_id": entity_id,
-                "selected_count": len(state_manager.selected_entities)
-            })
-            
-            return StatusResponse(
-                success=True,
-                message=f"Entity {entity_id} deselected",
-                data={"entity_id": entity_id}
-            )
-        else:
-            return StatusResponse(
-                success=False,
-                message=f"Entity {entity_id} was not selected"
-            )
-            
-    except Exception as e:
-        logger.error(f"Error deselecting entity: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-
-@router.post("/selection/clear", response_model=StatusResponse)
-async def clear_selection():
-    """Clear all entity selections."""
-    try:
-        selected_count = len(state_manager.selected_entities)
-        state_manager.clear_selection()
-        
-        await broadcast_update("selection_cleared", {
-            "previously_selected": selected_count
+    success = state_manager.deselect_entity(entity_id)
+    if success:
+        broadcast_update("entity_deselected", {
+            "entity_id": entity_id,
+            "selected_count": len(state_manager.selected_entities)
         })
         
         return StatusResponse(
             success=True,
-            message=f"Cleared {selected_count} selections",
-            data={"cleared_count": selected_count}
+            message=f"Entity {entity_id} deselected",
+            data={"entity_id": entity_id}
+        )
+    else:
+        return StatusResponse(
+            success=False,
+            message=f"Entity {entity_id} was not selected"
         )
-        
-    except Exception as e:
-        logger.error(f"Error clearing selection: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/selection/clear", response_model=StatusResponse)
+@handle_api_errors("Error clearing selection")
+async def clear_selection():
+    """Clear all entity selections."""
+    selected_count = len(state_manager.selected_entities)
+    state_manager.clear_selection()
+    
+    broadcast_update("selection_cleared", {
+        "previously_selected": selected_count
+    })
+    
+    return StatusResponse(
+        success=True,
+        message=f"Cleared {selected_count} selections",
+        data={"cleared_count": selected_count}
+    )
+
+@router.post("/selection/set", response_model=StatusResponse)
+@handle_api_errors("Error setting selection")
+async def set_selection(request: SelectionRequest):
+    """Replace the entity selection, broadcasting a single change event."""
+    added, removed = state_manager.set_selection(request.ids)
+    selected_count = len(state_manager.selected_entities)
+    
+    if added or removed:
+        broadcast_update("selection_changed", {
+            "added": added,
+            "removed": removed,
+            "selected_count": selected_count
+        })
+    
+    return StatusResponse(
+        success=True,
+        message=f"Selection set to {selected_count} entities",
+        data={"added": added, "removed": removed, "selected_count": selected_count}
+    )
 
 # Group Management
 
 @router.get("/groups", response_model=StatusResponse)
+@handle_api_errors("Error getting groups")
 async def get_groups():
     """Get all groups."""
-    try:
-        groups = state_manager.get_all_groups()
-        groups_data = [group.to_dict() for group in groups]
-        
-        return StatusResponse(
-            success=True,
-            message=f"Retrieved {len(groups)} groups",
-            data={"groups": groups_data}
-        )
-        
-    except Exception as e:
-        logger.error(f"Error getting groups: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    groups = state_manager.get_all_groups()
+    groups_data = [group.to_dict() for group in groups]
+    
+    return StatusResponse(
+        success=True,
+        message=f"Retrieved {len(groups)} groups",
+        data={"groups": groups_data}
+    )
 
 @router.post("/groups", response_model=StatusResponse)
+@handle_api_errors("Error creating group")
 async def create_group(request: GroupRequest):
     """Create an entity group."""
-    try:
-        # Validate that all entities exist
-        missing_entities = []
-        valid_entities = []
-        
-        for entity_id in request.members:
-            entity = state_manager.get_entity(entity_id)
-            if entity:
-                valid_entities.append(entity_id)
-            else:
-                missing_entities.append(entity_id)
-        
-        if missing_entities:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Entities not found: {missing_entities}"
-            )
-        
-        # Generate unique group ID
-        import uuid
-        group_id = f"group_{str(uuid.uuid4())[:8]}"
-        
-        # Create the group
-        group = state_manager.create_group(group_id, request.name, valid_entities)
-        if not group:
-            raise HTTPException(status_code=400, detail="Failed to create group")
-        
-        # Broadcast group creation
-        await broadcast_update("group_created", group.to_dict())
-        
-        return StatusResponse(
-            success=True,
-            message=f"Group '{request.name}' created with {len(valid_entities)} members",
-            data=group.to_dict()
+    # Validate that all entities exist (direct dict membership, no per-ID call)
+    entities = state_manager.entities
+    missing_entities = [entity_id for entity_id in request.members if entity_id not in entities]
+    
+    if missing_entities:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Entities not found: {missing_entities}"
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error creating group: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    # Generate unique group ID
+    group_id = f"group_{uuid4().hex[:8]}"
+    
+    # Create the group
+    valid_entities = request.members
+    group = state_manager.create_group(group_id, request.name, valid_entities)
+    if not group:
+        raise HTTPException(status_code=400, detail="Failed to create group")
+    
+    # Broadcast group creation
+    group_data = group.to_dict()
+    broadcast_update("group_created", group_data)
+    
+    return StatusResponse(
+        success=True,
+        message=f"Group '{request.name}' created with {len(valid_entities)} members",
+        data=group_data
+    )
 
 @router.put("/groups/order", response_model=StatusResponse)
+@handle_api_errors("Error updating group order", detail="Failed to update group order")
 async def update_group_order(request: OrderRequest):
     """Update the display order of groups."""
-    try:
-        state_manager.set_group_order(request.ordered_ids)
-        
-        # Broadcast to clients
-        if connection_manager:
-            await connection_manager.broadcast({
-                "type": "groups_reordered",
-                "ordered_ids": request.ordered_ids
-            })
-        
-        return StatusResponse(success=True, message="Group order updated")
-        
-    except Exception as e:
-        logger.error(f"Error updating group order: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update group order")
+    state_manager.set_group_order(request.ordered_ids)
+    
+    # Broadcast to clients (only the newest pending order is sent)
+    if connection_manager:
+        broadcast_coalescer.schedule(("groups_reordered",), {
+            "type": "groups_reordered",
+            "ordered_ids": request.ordered_ids
+        })
+    
+    return StatusResponse(success=True, message="Group order updated")
 
 @router.get("/groups/{group_id}", response_model=StatusResponse)
+@handle_api_errors("Error getting group {group_id}")
 async def get_group(group_id: str):
     """Get a specific group."""
-    try:
-        group = state_manager.get_group(group_id)
-        if not group:
-            raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
-        
-        return StatusResponse(
-            success=True,
-            message=f"Retrieved group {group_id}",
-            data=group.to_dict()
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting group {group_id}: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    group = state_manager.get_group(group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
+    
+    return StatusResponse(
+        success=True,
+        message=f"Retrieved group {group_id}",
+        data=group.to_dict()
+    )
 
 @router.put("/groups/{group_id}", response_model=StatusResponse)
+@handle_api_errors("Error updating group {group_id}")
 async def update_group(group_id: str, request: GroupUpdateRequest):
     """Update a group."""
-    try:
-        group = state_manager.get_group(group_id)
-        if not group:
-            raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
-        
-        # Validate members if provided
-        if request.members is not None:
-            missing_entities = []
-            for entity_id in request.members:
-                if not state_manager.get_entity(entity_id):
-                    missing_entities.append(entity_id)
-            
-            if missing_entities:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Entities not found: {missing_entities}"
-                )
-        
-        # Update the group
-        success = state_manager.update_group(group_id, request.name, request.members)
-        if not success:
-            raise HTTPException(status_code=400, detail="Failed to update group")
-        
-        # Get updated group data
-        updated_group = state_manager.get_group(group_id)
+    group = state_manager.get_group(group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
+    
+    # Validate members if provided
+    if request.members is not None:
+        entities = state_manager.entities
+        missing_entities = [entity_id for entity_id in request.members if entity_id not in entities]
         
-        # Broadcast group update
-        await broadcast_update("group_updated", updated_group.to_dict())
-        
-        return StatusResponse(
-            success=True,
-            message=f"Group '{updated_group.name}' updated",
-            data=updated_group.to_dict()
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating group {group_id}: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        if missing_entities:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Entities not found: {missing_entities}"
+            )
+    
+    # Update the group
+    updated_group = state_manager.update_group(group_id, request.name, request.members)
+    if not updated_group:
+        raise HTTPException(status_code=400, detail="Failed to update group")
+    
+    # Broadcast group update
+    group_data = updated_group.to_dict()
+    broadcast_update("group_updated", group_data)
+    
+    return StatusResponse(
+        success=True,
+        message=f"Group '{updated_group.name}' updated",
+        data=group_data
+    )
 
 @router.delete("/groups/{group_id}", response_model=StatusResponse)
+@handle_api_errors("Error deleting group {group_id}")
 async def delete_group(group_id: str):
     """Delete a group."""
-    try:
-        group = state_manager.get_group(group_id)
-        if not group:
-            raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
-        
-        group_name = group.name
-        
-        # Delete the group
-        success = state_manager.delete_group(group_id)
-        if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete group")
-        
-        # Broadcast group deletion
-        await broadcast_update("group_deleted", {"group_id": group_id, "group_name": group_name})
-        
-        return StatusResponse(
-            success=True,
-            message=f"Group '{group_name}' deleted",
-            data={"group_id": group_id, "group_name": group_name}
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting group {group_id}: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    # Delete the group
+    group = state_manager.delete_group(group_id)
+    if not group:
+        raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
+    
+    group_name = group.name
+    
+    # Broadcast group deletion
+    broadcast_update("group_deleted", {"group_id": group_id, "group_name": group_name})
+    
+    return StatusResponse(
+        success=True,
+        message=f"Group '{group_name}' deleted",
+        data={"group_id": group_id, "group_name": group_name}
+    )
 
 # Test and Development Endpoints
 
 @router.post("/test/scenario")
+@handle_api_errors("Error spawning test scenario")
 async def spawn_test_scenario(drones: int = 10, targets: int = 5):
     """Spawn a test scenario with specified number of entities."""
-    try:
-        simulation_engine.spawn_test_scenario(drones, targets)
-        
-        await broadcast_update("test_scenario_spawned", {
-            "drones": drones,
-            "targets": targets,
-            "total_entities": drones + targets
-        })
-        
-        return StatusResponse(
-            success=True,
-            message=f"Test scenario spawned: {drones} drones, {targets} targets",
-            data={"drones": drones, "targets": targets}
-        )
-        
-    except Exception as e:
-        logger.error(f"Error spawning test scenario: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    simulation_engine.spawn_test_scenario(drones, targets)
+    
+    broadcast_update("test_scenario_spawned", {
+        "drones": drones,
+        "targets": targets,
+        "total_entities": drones + targets
+    })
+    
+    return StatusResponse(
+        success=True,
+        message=f"Test scenario spawned: {drones} drones, {targets} targets",
+        data={"drones": drones, "targets": targets}
+    )
 
 @router.get("/events")
+@handle_api_errors("Error getting events", detail="Failed to get events")
 async def get_recent_events(count: int = 20):
     """Get recent simulation events."""
-    try:
-        events = state_manager.get_recent_events(count)
-        return {
-            "success": True,
-            "events": [event.to_dict() for event in events]
-        }
-        
-    except Exception as e:
-        logger.error(f"Error getting events: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get events")
+    events = state_manager.get_recent_events(count)
+    return ORJSONResponse(content={
+        "success": True,
+        "events": [event.to_dict() for event in events]
+    })
 
 @router.put("/assets/order", response_model=StatusResponse)
+@handle_api_errors("Error updating asset order", detail="Failed to update asset order")
 async def update_asset_order(request: OrderRequest):
     """Update the display order of assets (entities)."""
-    try:
-        # Save the order in state manager (persists across test scenario respawns)
-        state_manager.set_entity_order(request.ordered_ids)
-        
-        # Broadcast to clients
-        if connection_manager:
-            await connection_manager.broadcast({
-                "type": "assets_reordered",
-                "ordered_ids": request.ordered_ids
-            })
-        
-        return StatusResponse(success=True, message="Asset order updated")
-        
-    except Exception as e:
-        logger.error(f"Error updating asset order: {e}")
-        raise HTTPException(status_code=500, detail="Failed to update asset order")
+    # Save the order in state manager (persists across test scenario respawns)
+    state_manager.set_entity_order(request.ordered_ids)
+    
+    # Broadcast to clients (only the newest pending order is sent)
+    if connection_manager:
+        broadcast_coalescer.schedule(("assets_reordered",), {
+            "type": "assets_reordered",
+            "ordered_ids": request.ordered_ids
+        })
+    
+    return StatusResponse(success=True, message="Asset order updated")
 
 @router.get("/test-browser")
 async def test_browser_connection():
@@ -662,55 +732,39 @@ async def test_browser_connection():
     return {"success": True, "message": "Browser connection working", "timestamp": time.time()}
 
 @router.post("/groups/{group_id}/members/{entity_id}", response_model=StatusResponse)
+@handle_api_errors("Error adding entity to group")
 async def add_entity_to_group(group_id: str, entity_id: str):
     """Add entity to group."""
-    try:
-        success = state_manager.add_entity_to_group(group_id, entity_id)
-        if not success:
-            if not state_manager.get_group(group_id):
-                raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
-            if not state_manager.get_entity(entity_id):
-                raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
-            raise HTTPException(status_code=400, detail="Failed to add entity to group")
-        
-        group = state_manager.get_group(group_id)
-        await broadcast_update("group_updated", group.to_dict())
-        
-        return StatusResponse(
-            success=True,
-            message=f"Entity {entity_id} added to group {group.name}",
-            data=group.to_dict()
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error adding entity to group: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+    group = state_manager.add_entity_to_group(group_id, entity_id)
+    if not group:
+        if not state_manager.get_group(group_id):
+            raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
+        if not state_manager.get_entity(entity_id):
+            raise HTTPException(status_code=404, detail=f"Entity {entity_id} not found")
+        raise HTTPException(status_code=400, detail="Failed to add entity to group")
+    
+    group_data = group.to_dict()
+    broadcast_update("group_updated", group_data)
+    
+    return StatusResponse(
+        success=True,
+        message=f"Entity {entity_id} added to group {group.name}",
+        data=group_data
+    )
 
 @router.delete("/groups/{group_id}/members/{entity_id}", response_model=StatusResponse)
+@handle_api_errors("Error removing entity from group")
 async def remove_entity_from_group(group_id: str, entity_id: str):
     """Remove entity from group."""
-    try:
-        group = state_manager.get_group(group_id)
-        if not group:
-            raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
-        
-        success = state_manager.remove_entity_from_group(group_id, entity_id)
-        if not success:
-            raise HTTPException(status_code=400, detail="Entity not in group")
-        
-        updated_group = state_manager.get_group(group_id)
-        await broadcast_update("group_updated", updated_group.to_dict())
-        
-        return StatusResponse(
-            success=True,
-            message=f"Entity {entity_id} removed from group {updated_group.name}",
-            data=updated_group.to_dict()
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error removing entity from group: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+    updated_group = state_manager.remove_entity_from_group(group_id, entity_id)
+    if not updated_group:
+        raise HTTPException(status_code=404, detail=f"Group {group_id} not found")
+    
+    group_data = updated_group.to_dict()
+    broadcast_update("group_updated", group_data)
+    
+    return StatusResponse(
+        success=True,
+        message=f"Entity {entity_id} removed from group {updated_group.name}",
+        data=group_data
+    )
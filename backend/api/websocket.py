@@ -3,19 +3,28 @@ WebSocket message handler for BGCS real-time communication.
 Handles incoming WebSocket messages and routes commands to appropriate handlers.
 """
 
-import json
 import asyncio
 import logging
-from typing import Dict, Any, Optional, Set
+import msgpack
+import orjson
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime
 
 from ..state.manager import state_manager
 from ..simulation.engine import SimulationEngine
-from ..entities.base import Vector3
+from ..entities.base import Vector3, path_triples
 
 logger = logging.getLogger(__name__)
 
+# Maximum frames buffered per client before older frames are dropped
+CLIENT_QUEUE_SIZE = 64
+
+# Encodings a client can request for state_update frames via "subscribe"
+STATE_ENCODINGS = ("json", "msgpack")
+
 # Global simulation engine reference (set in main.py)
 simulation_engine = None
 
@@ -25,6 +34,15 @@ def set_simulation_engine(engine):
     simulation_engine = engine
 
 
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Serialize an outbound message to a UTF-8 JSON frame.
+
+    datetime values are encoded natively by orjson in ISO 8601 form, so
+    messages carry datetime objects rather than pre-formatted strings.
+    """
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+
+
 class WebSocketMessage:
     """Represents a WebSocket message."""
     
@@ -32,7 +50,7 @@ class WebSocketMessage:
         self.type = message_type
         self.data = data
         self.client_id = client_id
-        self.timestamp = datetime.now().isoformat()
+        self.timestamp = datetime.now()  # formatted by encode_message
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -43,33 +61,86 @@ class WebSocketMessage:
         }
 
 
+class ClientSendQueue:
+    """Bounded outbound frame queue for one client.
+
+    Holds at most one pending state_update: a newer snapshot replaces the
+    queued one in place, so a lagging client only ever receives the latest
+    state while other messages keep their order. When full, the pending
+    state_update is dropped before any command or event message.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: deque = deque()
+        self._pending_state: Optional[List[bytes]] = None
+        self._ready = asyncio.Event()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def put_state(self, frame: bytes):
+        """Queue a state_update frame, replacing one that has not been sent yet."""
+        if self._pending_state is not None:
+            self._pending_state[0] = frame
+            return
+        if len(self._items) >= self.maxsize:
+            # A newer snapshot follows shortly, so a backed-up client just skips this one
+            return
+        self._pending_state = [frame]
+        self._append(self._pending_state)
+    
+    def put(self, frame: bytes) -> bool:
+        """Queue a message frame, making room when full.
+
+        The pending state_update is evicted first (a newer one will follow);
+        only when none is queued is the oldest message dropped, in which case
+        False is returned.
+        """
+        dropped_message = False
+        if len(self._items) >= self.maxsize:
+            pending_state = self._pending_state
+            if pending_state is not None:
+                # Find by identity: equal frame bytes must not match a message entry
+                for index, entry in enumerate(self._items):
+                    if entry is pending_state:
+                        del self._items[index]
+                        break
+                self._pending_state = None
+            else:
+                self._items.popleft()
+                dropped_message = True
+        self._append([frame])
+        return not dropped_message
+    
+    async def get(self) -> bytes:
+        """Wait for and remove the next frame."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        entry = self._items.popleft()
+        if entry is self._pending_state:
+            self._pending_state = None
+        return entry[0]
+    
+    def _append(self, entry: List[bytes]):
+        self._items.append(entry)
+        self._ready.set()
+
+
 class WebSocketManager:
     """Manages WebSocket connections and message routing."""
     
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        # Outbound frames per client, drained by a writer task
+        self.send_queues: Dict[str, ClientSendQueue] = {}
+        self.writer_tasks: Dict[str, asyncio.Task] = {}
         self.client_counter = 0
-        self.message_handlers = {}
-        self.broadcast_queue = asyncio.Queue()
-        self.setup_message_handlers()
-    
-    def setup_message_handlers(self):
-        """Setup message type handlers."""
-        self.message_handlers = {
-            "ping": self._handle_ping,
-            "get_state": self._handle_get_state,
-            "spawn_entity": self._handle_spawn_entity,
-            "set_entity_mode": self._handle_set_entity_mode,
-            "set_entity_path": self._handle_set_entity_path,
-            "delete_entity": self._handle_delete_entity,
-            "select_entity": self._handle_select_entity,
-            "deselect_entity": self._handle_deselect_entity,
-            "clear_selection": self._handle_clear_selection,
-            "simulation_control": self._handle_simulation_control,
-            "chat_message": self._handle_chat_message,
-            "subscribe": self._handle_subscribe,
-            "unsubscribe": self._handle_unsubscribe
-        }
+        # State update encoding negotiated by each client (defaults to JSON)
+        self.client_encodings: Dict[str, str] = {}
+        # Last state_update frame per encoding, keyed on the snapshot bytes it was built from
+        self._state_frames: Dict[str, Tuple[bytes, bytes]] = {}
     
     async def connect(self, websocket: WebSocket) -> str:
         """Accept new WebSocket connection and return client ID."""
@@ -77,6 +148,9 @@ class WebSocketManager:
         self.client_counter += 1
         client_id = f"client_{self.client_counter}"
         self.active_connections[client_id] = websocket
+        queue = ClientSendQueue(CLIENT_QUEUE_SIZE)
+        self.send_queues[client_id] = queue
+        self.writer_tasks[client_id] = asyncio.create_task(self._writer(client_id, websocket, queue))
         
         logger.info(f"WebSocket client {client_id} connected. Total connections: {len(self.active_connections)}")
         
@@ -88,7 +162,7 @@ class WebSocketManager:
                 "type": "connection_established",
                 "data": {
                     "client_id": client_id,
-                    "server_time": datetime.now().isoformat(),
+                    "server_time": datetime.now(),
                     "simulation_running": simulation_running
                 }
             }
@@ -106,18 +180,24 @@ class WebSocketManager:
         """Remove WebSocket connection."""
         if client_id in self.active_connections:
             del self.active_connections[client_id]
+            self.send_queues.pop(client_id, None)
+            self.client_encodings.pop(client_id, None)
+            writer_task = self.writer_tasks.pop(client_id, None)
+            if writer_task is not None and writer_task is not asyncio.current_task():
+                writer_task.cancel()
             logger.info(f"WebSocket client {client_id} disconnected. Total connections: {len(self.active_connections)}")
     
     async def handle_message(self, client_id: str, message: str):
         """Handle incoming WebSocket message."""
         try:
-            data = json.loads(message)
+            data = orjson.loads(message)
             message_type = data.get("type")
             message_data = data.get("data", {})
             message_id = data.get("message_id")
             
-            if message_type in self.message_handlers:
-                response = await self.message_handlers[message_type](client_id, message_data)
+            handler = MESSAGE_HANDLERS.get(message_type)
+            if handler is not None:
+                response = await handler(self, client_id, message_data)
                 if response:
                     # Include message_id in response if it was provided
                     if message_id:
@@ -129,7 +209,7 @@ class WebSocketManager:
                     error_response["message_id"] = message_id
                 await self._send_to_client(client_id, error_response)
                 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             await self._send_error(client_id, "Invalid JSON format")
         except Exception as e:
             logger.error(f"Error handling message from {client_id}: {e}")
@@ -140,28 +220,47 @@ class WebSocketManager:
         if not self.active_connections:
             return
         
-        message_str = json.dumps(message)
-        disconnected = []
-        
-        for client_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(message_str)
-            except Exception as e:
-                logger.warning(f"Failed to send to client {client_id}: {e}")
-                disconnected.append(client_id)
-        
-        # Remove disconnected clients
-        for client_id in disconnected:
-            self.disconnect(client_id)
+        # Encode once and fan the same frame out to every client
+        await self.broadcast_frame(encode_message(message))
+    
+    async def broadcast_frame(self, frame: bytes):
+        """Queue an already encoded frame for all connected clients."""
+        for client_id in list(self.active_connections):
+            self._enqueue(client_id, frame, False)
     
     async def _send_to_client(self, client_id: str, message: Dict[str, Any]):
         """Send message to specific client."""
         if client_id in self.active_connections:
+            await self._send_frame(client_id, encode_message(message))
+    
+    async def _send_frame(self, client_id: str, frame: bytes, is_state_update: bool = False):
+        """Queue an already encoded frame for specific client."""
+        self._enqueue(client_id, frame, is_state_update)
+    
+    def _enqueue(self, client_id: str, frame: bytes, is_state_update: bool):
+        """Put a frame on a client's send queue without waiting on the socket."""
+        queue = self.send_queues.get(client_id)
+        if queue is None:
+            return
+        
+        if is_state_update:
+            queue.put_state(frame)
+        elif not queue.put(frame):
+            logger.warning(f"Send queue full for client {client_id}, dropping oldest message")
+    
+    async def _writer(self, client_id: str, websocket: WebSocket, queue: ClientSendQueue):
+        """Drain a client's send queue onto its socket."""
+        # Hand frames straight to the ASGI send interface (what send_bytes wraps)
+        send = websocket.send
+        while True:
+            frame = await queue.get()
             try:
-                await self.active_connections[client_id].send_text(json.dumps(message))
+                # Frames go out as binary so the encoded bytes are never decoded and re-encoded
+                await send({"type": "websocket.send", "bytes": frame})
             except Exception as e:
                 logger.warning(f"Failed to send to client {client_id}: {e}")
                 self.disconnect(client_id)
+                return
     
     async def _send_error(self, client_id: str, error_message: str):
         """Send error message to client."""
@@ -170,19 +269,29 @@ class WebSocketManager:
             "data": {"message": error_message}
         })
     
+    def _state_update_frame(self, encoding: str = "json") -> bytes:
+        """Get the encoded state_update frame, rebuilt only when the snapshot changes."""
+        snapshot, snapshot_json = state_manager.get_cached_state_snapshot()
+        cached = self._state_frames.get(encoding)
+        if cached is None or cached[0] is not snapshot_json:
+            if encoding == "msgpack":
+                frame = msgpack.packb({"type": "state_update", "data": snapshot})
+            else:
+                frame = b'{"type":"state_update","data":' + snapshot_json + b'}'
+            cached = (snapshot_json, frame)
+            self._state_frames[encoding] = cached
+        return cached[1]
+    
     async def _send_state_update(self, client_id: Optional[str] = None):
         """Send state update to client(s)."""
         try:
-            snapshot = state_manager.get_state_snapshot()
-            message = {
-                "type": "state_update",
-                "data": snapshot
-            }
-            
             if client_id:
-                await self._send_to_client(client_id, message)
+                frame = self._state_update_frame(self.client_encodings.get(client_id, "json"))
+                await self._send_frame(client_id, frame, is_state_update=True)
             else:
-                await self.broadcast(message)
+                for target_id in list(self.active_connections):
+                    frame = self._state_update_frame(self.client_encodings.get(target_id, "json"))
+                    self._enqueue(target_id, frame, True)
                 
         except Exception as e:
             logger.error(f"Error sending state update: {e}")
@@ -194,7 +303,7 @@ class WebSocketManager:
         return {
             "type": "pong",
             "data": {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": datetime.now(),
                 "client_id": client_id
             }
         }
@@ -322,15 +431,12 @@ class WebSocketManager:
             if replace:
                 entity.clear_waypoints()
             
-            waypoints_added = 0
-            for pos_data in path_data:
-                waypoint = Vector3(
-                    pos_data.get("x", 0),
-                    pos_data.get("y", 0),
-                    pos_data.get("z", 0)
-                )
-                entity.add_waypoint(waypoint)
-                waypoints_added += 1
+            waypoints = [
+                Vector3(pos_data.get("x", 0), pos_data.get("y", 0), pos_data.get("z", 0))
+                for pos_data in path_data
+            ]
+            entity.add_waypoints(waypoints)
+            waypoints_added = len(waypoints)
             
             if waypoints_added > 0 and hasattr(entity, 'set_mode'):
                 entity.set_mode("waypoint_mode")
@@ -345,7 +451,7 @@ class WebSocketManager:
                 "type": "entity_path_changed",
                 "data": {
                     "entity_id": entity_id,
-                    "path": path_data,
+                    "path": path_triples(waypoints),
                     "waypoints_added": waypoints_added,
                     "changed_by": client_id
                 }
@@ -413,7 +519,7 @@ class WebSocketManager:
                     "data": {
                         "entity_id": entity_id,
                         "selected_by": client_id,
-                        "selected_entities": state_manager.selected_entities
+                        "selected_entities": orjson.Fragment(state_manager.get_selected_entities_json())
                     }
                 })
                 
@@ -442,7 +548,7 @@ class WebSocketManager:
                 "data": {
                     "entity_id": entity_id,
                     "deselected_by": client_id,
-                    "selected_entities": state_manager.selected_entities
+                    "selected_entities": orjson.Fragment(state_manager.get_selected_entities_json())
                 }
             })
             
@@ -534,7 +640,7 @@ class WebSocketManager:
                 "data": {
                     "sender": sender,
                     "message": message,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": datetime.now(),
                     "from_client": client_id
                 }
             })
@@ -548,9 +654,19 @@ class WebSocketManager:
         """Handle subscription to specific update types."""
         # For now, all clients get all updates
         # Future enhancement could filter updates based on subscriptions
+        encoding = data.get("encoding")
+        if encoding is not None:
+            if encoding not in STATE_ENCODINGS:
+                return {"type": "error", "data": {"message": f"Unsupported encoding: {encoding}"}}
+            # State updates switch to MessagePack; other messages stay JSON
+            self.client_encodings[client_id] = encoding
+        
         return {
             "type": "subscription_confirmed",
-            "data": {"message": "Subscribed to updates"}
+            "data": {
+                "message": "Subscribed to updates",
+                "encoding": self.client_encodings.get(client_id, "json")
+            }
         }
     
     async def _handle_unsubscribe(self, client_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -561,6 +677,24 @@ class WebSocketManager:
         }
 
 
+# Message type -> handler, built once from the unbound WebSocketManager methods
+MESSAGE_HANDLERS = MappingProxyType({
+    "ping": WebSocketManager._handle_ping,
+    "get_state": WebSocketManager._handle_get_state,
+    "spawn_entity": WebSocketManager._handle_spawn_entity,
+    "set_entity_mode": WebSocketManager._handle_set_entity_mode,
+    "set_entity_path": WebSocketManager._handle_set_entity_path,
+    "delete_entity": WebSocketManager._handle_delete_entity,
+    "select_entity": WebSocketManager._handle_select_entity,
+    "deselect_entity": WebSocketManager._handle_deselect_entity,
+    "clear_selection": WebSocketManager._handle_clear_selection,
+    "simulation_control": WebSocketManager._handle_simulation_control,
+    "chat_message": WebSocketManager._handle_chat_message,
+    "subscribe": WebSocketManager._handle_subscribe,
+    "unsubscribe": WebSocketManager._handle_unsubscribe
+})
+
+
 # Global WebSocket manager instance
 websocket_manager = WebSocketManager()
 
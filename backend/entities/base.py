@@ -3,22 +3,43 @@ Base entity class for all entities in the BGCS system.
 Provides common properties for position, physics, and state management.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Deque, Iterable, List, Optional, Dict, Any
+from collections import deque
 from dataclasses import dataclass
+import itertools
 import time
 import uuid
 import math
 
+# Default entity IDs: a random per-process prefix plus a counter, so IDs stay
+# unique across restarts and saved snapshots without a uuid4() call per entity
+_ENTITY_ID_PREFIX = uuid.uuid4().hex[:8]
+_entity_id_counter = itertools.count(1)
+
 def safe_float(value: float) -> float:
     """Convert float to JSON-safe value, handling inf and NaN."""
+    # x - x is 0 for every finite value and NaN for inf/NaN, so the common case is one compare
+    if value - value == 0:
+        return value
     if math.isinf(value):
         return 1000000.0 if value > 0 else -1000000.0  # Large but finite values
-    elif math.isnan(value):
-        return 0.0
-    return value
+    return 0.0
+
+
+def safe_vector_dict(vector: 'Vector3') -> Dict[str, float]:
+    """Convert a vector to a JSON-safe {x, y, z} dict, checking all components at once."""
+    x, y, z = vector.x, vector.y, vector.z
+    if (x - x) + (y - y) + (z - z) == 0:
+        return {"x": x, "y": y, "z": z}
+    return {"x": safe_float(x), "y": safe_float(y), "z": safe_float(z)}
+
 
+def path_triples(points: Iterable['Vector3']) -> List[List[float]]:
+    """Convert waypoints to the JSON-safe [[x, y, z], ...] form used in path broadcasts."""
+    return [[safe_float(p.x), safe_float(p.y), safe_float(p.z)] for p in points]
 
-@dataclass
+
+@dataclass(slots=True)
 class Vector3:
     """3D vector for position, velocity, etc."""
     x: float = 0.0
@@ -34,28 +55,71 @@ class Vector3:
     def __mul__(self, scalar: float) -> 'Vector3':
         return Vector3(self.x * scalar, self.y * scalar, self.z * scalar)
     
+    def set(self, x: float, y: float, z: float) -> 'Vector3':
+        """Overwrite all components in place."""
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
+    
+    def iadd_scaled(self, other: 'Vector3', scalar: float) -> 'Vector3':
+        """Add other * scalar to this vector in place."""
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+        self.z += other.z * scalar
+        return self
+    
+    def iscale(self, scalar: float) -> 'Vector3':
+        """Multiply this vector by scalar in place."""
+        self.x *= scalar
+        self.y *= scalar
+        self.z *= scalar
+        return self
+    
     def magnitude(self) -> float:
         """Calculate vector magnitude."""
-        return (self.x ** 2 + self.y ** 2 + self.z ** 2) ** 0.5
+        x, y, z = self.x, self.y, self.z
+        return math.sqrt(x * x + y * y + z * z)
     
     def normalize(self) -> 'Vector3':
         """Return normalized vector."""
         mag = self.magnitude()
         if mag == 0:
             return Vector3(0, 0, 0)
-        return Vector3(self.x / mag, self.y / mag, self.z / mag)
+        inv_mag = 1.0 / mag
+        return Vector3(self.x * inv_mag, self.y * inv_mag, self.z * inv_mag)
     
     def distance_to(self, other: 'Vector3') -> float:
         """Calculate distance to another vector."""
-        return (other - self).magnitude()
+        dx = other.x - self.x
+        dy = other.y - self.y
+        dz = other.z - self.z
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
+    
+    def distance_squared_to(self, other: 'Vector3') -> float:
+        """Calculate squared distance to another vector (cheaper for range checks)."""
+        dx = other.x - self.x
+        dy = other.y - self.y
+        dz = other.z - self.z
+        return dx * dx + dy * dy + dz * dz
 
 
 class Entity:
     """Base class for all entities in the simulation."""
     
+    __slots__ = (
+        "id", "entity_type",
+        "position", "heading", "velocity",
+        "max_speed", "detection_radius", "collision_radius",
+        "health", "detected", "selected", "destroyed",
+        "target_position", "waypoints", "current_mode",
+        "sort_index",
+        "created_time", "last_update_time",
+    )
+    
     def __init__(self, entity_id: Optional[str] = None, position: Optional[Vector3] = None):
         # Identity
-        self.id: str = entity_id or str(uuid.uuid4())
+        self.id: str = entity_id or f"{_ENTITY_ID_PREFIX}-{next(_entity_id_counter)}"
         self.entity_type: str = "entity"
         
         # Position & Kinematics
@@ -76,7 +140,7 @@ class Entity:
         
         # Control Data
         self.target_position: Vector3 = Vector3(0, 0, 0)  # 3D target position
-        self.waypoints: List[Vector3] = []  # Waypoint queue
+        self.waypoints: Deque[Vector3] = deque()  # Waypoint queue (popped from the front)
         self.current_mode: str = "idle"  # Current behavior mode
         
         # Display ordering
@@ -86,18 +150,33 @@ class Entity:
         self.created_time: float = time.time()
         self.last_update_time: float = time.time()
     
-    def update(self, delta_time: float) -> None:
-        """Update entity state. Override in subclasses."""
-        self.last_update_time = time.time()
+    def update(self, delta_time: float, now: Optional[float] = None) -> None:
+        """
+        Update entity state. Override in subclasses.
+        
+        `now` is the tick timestamp, read once per tick by the caller so
+        every entity in a tick shares it; defaults to the current time.
+        """
+        self.last_update_time = time.time() if now is None else now
         
         # Basic physics update
         if not self.destroyed:
-            # Apply velocity
-            self.position = self.position + (self.velocity * delta_time)
-            
-            # Clamp velocity to max speed
-            if self.velocity.magnitude() > self.max_speed:
-                self.velocity = self.velocity.normalize() * self.max_speed
+            self._integrate(delta_time)
+    
+    def _integrate(self, delta_time: float) -> None:
+        """Apply velocity to position and clamp velocity to max speed."""
+        # Mutate position and velocity in place so the step allocates nothing
+        velocity = self.velocity
+        
+        # Apply velocity
+        self.position.iadd_scaled(velocity, delta_time)
+        
+        # Clamp velocity to max speed, comparing squared magnitudes
+        vx, vy, vz = velocity.x, velocity.y, velocity.z
+        speed_sq = vx * vx + vy * vy + vz * vz
+        max_speed = self.max_speed
+        if speed_sq > max_speed * max_speed:
+            velocity.iscale(max_speed / math.sqrt(speed_sq))
     
     def set_target_position(self, target: Vector3) -> None:
         """Set target position for movement."""
@@ -107,6 +186,10 @@ class Entity:
         """Add waypoint to queue."""
         self.waypoints.append(waypoint)
     
+    def add_waypoints(self, waypoints: Iterable[Vector3]) -> None:
+        """Add several waypoints to queue in one call."""
+        self.waypoints.extend(waypoints)
+    
     def clear_waypoints(self) -> None:
         """Clear all waypoints."""
         self.waypoints.clear()
@@ -114,7 +197,7 @@ class Entity:
     def get_next_waypoint(self) -> Optional[Vector3]:
         """Get next waypoint and remove it from queue."""
         if self.waypoints:
-            return self.waypoints.pop(0)
+            return self.waypoints.popleft()
         return None
     
     def distance_to(self, other: 'Entity') -> float:
@@ -123,12 +206,13 @@ class Entity:
     
     def is_within_detection_range(self, other: 'Entity') -> bool:
         """Check if another entity is within detection range."""
-        return self.distance_to(other) <= self.detection_radius
+        detection_radius = self.detection_radius
+        return self.position.distance_squared_to(other.position) <= detection_radius * detection_radius
     
     def is_colliding_with(self, other: 'Entity') -> bool:
         """Check if colliding with another entity."""
         combined_radius = self.collision_radius + other.collision_radius
-        return self.distance_to(other) <= combined_radius
+        return self.position.distance_squared_to(other.position) <= combined_radius * combined_radius
     
     def take_damage(self, damage: float) -> None:
         """Apply damage to entity."""
@@ -152,9 +236,9 @@ class Entity:
         return {
             "id": self.id,
             "entity_type": self.entity_type,
-            "position": {"x": safe_float(self.position.x), "y": safe_float(self.position.y), "z": safe_float(self.position.z)},
+            "position": safe_vector_dict(self.position),
             "heading": safe_float(self.heading),
-            "velocity": {"x": safe_float(self.velocity.x), "y": safe_float(self.velocity.y), "z": safe_float(self.velocity.z)},
+            "velocity": safe_vector_dict(self.velocity),
             "max_speed": safe_float(self.max_speed),
             "detection_radius": safe_float(self.detection_radius),
             "collision_radius": safe_float(self.collision_radius),
@@ -162,8 +246,8 @@ class Entity:
             "detected": self.detected,
             "selected": self.selected,
             "destroyed": self.destroyed,
-            "target_position": {"x": safe_float(self.target_position.x), "y": safe_float(self.target_position.y), "z": safe_float(self.target_position.z)},
-            "waypoints": [{"x": safe_float(wp.x), "y": safe_float(wp.y), "z": safe_float(wp.z)} for wp in self.waypoints],
+            "target_position": safe_vector_dict(self.target_position),
+            "waypoints": [safe_vector_dict(wp) for wp in self.waypoints],
             "current_mode": self.current_mode,
             "sort_index": self.sort_index,
             "created_time": self.created_time,
@@ -201,6 +285,6 @@ class Entity:
         
         # Set waypoints
         waypoints_data = data.get("waypoints", [])
-        entity.waypoints = [Vector3(**wp) for wp in waypoints_data]
+        entity.waypoints = deque(Vector3(**wp) for wp in waypoints_data)
         
         return entity
\ No newline at end of file
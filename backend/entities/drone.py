@@ -7,10 +7,78 @@ Waypoint Mode, Kamikaze, and Hold Position.
 import random
 import math
 import time
-from typing import Optional, Dict, Any, List
+from functools import lru_cache
+from math import atan2, cos, pi, remainder, sin, sqrt
+from random import random as _random
+from typing import Optional, Dict, Any, List, Tuple
 from .base import Entity, Vector3, safe_float
 
 
+def steer_towards(px: float, py: float, pz: float,
+                  tx: float, ty: float, tz: float,
+                  vx: float, vy: float, vz: float, heading: float,
+                  max_speed: float, turn_rate: float, approach_threshold: float,
+                  delta_time: float) -> Tuple[float, float, float, float]:
+    """
+    Steering step towards a target position with realistic flight dynamics.
+    
+    Pure float math with no entity access, so it can be called per drone or
+    over a batch. Returns the new (vx, vy, vz, heading).
+    """
+    dx = tx - px
+    dy = ty - py
+    dz = tz - pz
+    distance_sq = dx * dx + dy * dy + dz * dz
+    
+    # Compare squared distances so the approach path needs no sqrt
+    if distance_sq < approach_threshold * approach_threshold:
+        # Close enough, reduce speed
+        return vx * 0.8, vy * 0.8, vz * 0.8, heading
+    
+    if distance_sq == 0:
+        return vx, vy, vz, heading
+    
+    # Calculate desired direction
+    distance = sqrt(distance_sq)
+    inv_distance = 1.0 / distance
+    dir_x = dx * inv_distance
+    dir_y = dy * inv_distance
+    dir_z = dz * inv_distance
+    
+    # Update heading towards target
+    target_heading = atan2(dir_y, dir_x)
+    # Normalize angle difference into [-pi, pi] in one step
+    heading_diff = remainder(target_heading - heading, 2 * pi)
+    
+    # Turn towards target
+    max_turn = turn_rate * delta_time
+    if abs(heading_diff) > max_turn:
+        heading += max_turn if heading_diff > 0 else -max_turn
+    else:
+        heading = target_heading
+    
+    # Calculate velocity in 3D space
+    speed = min(max_speed, distance * 0.5)  # Slow down when close, cap at max_speed
+    return (
+        dir_x * speed,
+        dir_y * speed * 0.8,  # Slightly slower vertical movement
+        dir_z * speed,
+        heading
+    )
+
+
+@lru_cache(maxsize=1)
+def orbit_phase(now: float) -> Tuple[float, float]:
+    """
+    Return (cos, sin) of the slow follow-target orbit angle at `now`.
+    
+    Every drone in a tick is updated with the same `now`, so the trig is
+    evaluated once per tick rather than once per orbiting drone.
+    """
+    orbit_angle = now * 0.5  # Slow orbit
+    return cos(orbit_angle), sin(orbit_angle)
+
+
 class Drone(Entity):
     """
     Drone entity with delta wing shape and combat behaviors.
@@ -32,6 +100,35 @@ class Drone(Entity):
     - Grey: Destroyed
     """
     
+    __slots__ = (
+        "_state_manager",
+        "sensors",
+        "_gimbal_simulation_enabled", "_gimbal_time_offset",
+        "_gimbal_pattern", "_gimbal_speed_multiplier",
+        "target_entity_id", "teammate_entity_id",
+        "follow_distance", "kamikaze_enabled", "hunting_range",
+        "turn_rate", "approach_threshold", "patrol_area_size",
+        "last_random_target_time", "random_target_interval",
+        "engagement_range",
+    )
+    
+    # Valid behavior modes (shared by all drones)
+    valid_modes = (
+        "random_search",
+        "follow_target",
+        "follow_teammate",
+        "waypoint_mode",
+        "kamikaze",
+        "hold_position"
+    )
+    VALID_MODES = frozenset(valid_modes)  # for O(1) membership checks
+    
+    # Drone-specific float settings written by to_dict (sanitized for JSON)
+    _SERIALIZED_FLOAT_FIELDS = (
+        "follow_distance", "hunting_range", "turn_rate",
+        "approach_threshold", "patrol_area_size", "engagement_range"
+    )
+    
     def __init__(self, entity_id: Optional[str] = None, position: Optional[Vector3] = None, **kwargs):
         super().__init__(entity_id, position)
         self.entity_type = "drone"
@@ -76,26 +173,16 @@ class Drone(Entity):
         
         # State tracking with randomized start times to prevent synchronization
         self.last_random_target_time: float = -random.uniform(0, 10.0)  # Random start offset
-        self.random_target_interval: float = 10.0  # seconds
+        self.random_target_interval: float = 10.0  # seconds between new random targets
         self.engagement_range: float = 10.0  # meters for kamikaze
         
         # Set initial target position to spawn position to prevent sinking
         if position:
             self.target_position = Vector3(position.x, position.y, position.z)
         
-        # Valid behavior modes
-        self.valid_modes = [
-            "random_search",
-            "follow_target", 
-            "follow_teammate",
-            "waypoint_mode",
-            "kamikaze",
-            "hold_position"
-        ]
-        
         # Always default to random_search mode, but allow override if specified
         initial_mode = kwargs.get("current_mode", "random_search")
-        if initial_mode in self.valid_modes:
+        if initial_mode in self.VALID_MODES:
             self.current_mode = initial_mode
         else:
             self.current_mode = "random_search"  # Fallback to default if invalid mode provided
@@ -104,38 +191,28 @@ class Drone(Entity):
         """Set reference to state manager for entity interactions."""
         self._state_manager = state_manager
     
-    def update(self, delta_time: float) -> None:
+    def update(self, delta_time: float, now: Optional[float] = None) -> None:
         """Update drone state based on current behavior mode."""
-        super().update(delta_time)
+        self.last_update_time = time.time() if now is None else now
+        
+        if not self.destroyed:
+            # Update sensor gimbal simulation
+            self._update_gimbal_simulation(delta_time)
+            
+            # Execute behavior based on current mode
+            # (idle or unknown modes default to hold position)
+            self._MODE_UPDATES.get(self.current_mode, Drone._update_hold_position)(self, delta_time)
+            
+            # Integrate with the velocity the behavior just computed, rather
+            # than the previous tick's (a kamikaze hit destroys the drone)
+            if not self.destroyed:
+                self._integrate(delta_time)
         
         # Enforce ground level constraint - drones cannot go below ground (y=0)
         if self.position.y < 0:
             self.position.y = 0
             if self.velocity.y < 0:  # Stop downward movement
                 self.velocity.y = 0
-        
-        if self.destroyed:
-            return
-        
-        # Update sensor gimbal simulation
-        self._update_gimbal_simulation(delta_time)
-        
-        # Execute behavior based on current mode
-        if self.current_mode == "random_search":
-            self._update_random_search(delta_time)
-        elif self.current_mode == "follow_target":
-            self._update_follow_target(delta_time)
-        elif self.current_mode == "follow_teammate":
-            self._update_follow_teammate(delta_time)
-        elif self.current_mode == "waypoint_mode":
-            self._update_waypoint_mode(delta_time)
-        elif self.current_mode == "kamikaze":
-            self._update_kamikaze(delta_time)
-        elif self.current_mode == "hold_position":
-            self._update_hold_position(delta_time)
-        else:
-            # Default behavior for idle or unknown modes - hold position
-            self._update_hold_position(delta_time)
     
     def _update_random_search(self, delta_time: float) -> None:
         """Random Search: Patrol random waypoints."""
@@ -148,18 +225,19 @@ class Drone(Entity):
             # Generate random position within patrol area around drone's spawn area
             # Use current position as patrol center to avoid clustering
             center = self.position
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(0, self.patrol_area_size)
+            # Draw the three samples straight from random() (what uniform() wraps)
+            angle = 2 * pi * _random()
+            distance = self.patrol_area_size * _random()
             
             # Maintain current altitude range (±10m from current altitude)
-            current_altitude = max(50, self.position.y)  # Minimum 50m
-            altitude_variation = random.uniform(-10, 10)
+            current_altitude = max(50, center.y)  # Minimum 50m
+            altitude_variation = 20.0 * _random() - 10.0
             target_altitude = max(50, min(100, current_altitude + altitude_variation))
             
-            self.target_position = Vector3(
-                center.x + distance * math.cos(angle),  # East-West
+            self.target_position.set(
+                center.x + distance * cos(angle),  # East-West
                 target_altitude,  # Maintain altitude with small variation
-                center.z + distance * math.sin(angle)   # North-South
+                center.z + distance * sin(angle)   # North-South
             )
             
             self.last_random_target_time = current_time
@@ -178,31 +256,39 @@ class Drone(Entity):
             target_entity = self._state_manager.get_entity(self.target_entity_id)
             if target_entity and not target_entity.destroyed:
                 # Calculate position to maintain follow distance
-                direction = target_entity.position - self.position
-                distance = direction.magnitude()
+                # (scalar math on the components, updating target_position in place)
+                position = self.position
+                target_pos = target_entity.position
+                dx = target_pos.x - position.x
+                dy = target_pos.y - position.y
+                dz = target_pos.z - position.z
+                distance_sq = dx * dx + dy * dy + dz * dz
+                follow_distance = self.follow_distance
+                far_distance = follow_distance + 10
+                near_distance = follow_distance - 10
                 
-                if distance > self.follow_distance + 10:
+                if far_distance < 0 or distance_sq > far_distance * far_distance:
                     # Too far, move closer (maintain flight altitude)
-                    self.target_position = Vector3(target_entity.position.x, 60, target_entity.position.z)
-                elif distance < self.follow_distance - 10:
+                    self.target_position.set(target_pos.x, 60, target_pos.z)
+                elif near_distance > 0 and distance_sq < near_distance * near_distance:
                     # Too close, move away
-                    if direction.magnitude() > 0:
-                        retreat_direction = direction.normalize() * -1
-                        retreat_pos = self.position + (retreat_direction * self.follow_distance)
+                    if distance_sq > 0:
+                        retreat_scale = follow_distance / sqrt(distance_sq)
                         # Maintain flight altitude during retreat
-                        self.target_position = Vector3(retreat_pos.x, max(60, self.position.y), retreat_pos.z)
+                        self.target_position.set(
+                            position.x - dx * retreat_scale,
+                            max(60, position.y),
+                            position.z - dz * retreat_scale
+                        )
                 else:
-                    # Good distance, orbit around target (maintain flight altitude)
-                    import math
-                    orbit_angle = self.last_update_time * 0.5  # Slow orbit
-                    orbit_offset = Vector3(
-                        self.follow_distance * math.cos(orbit_angle),
-                        0,  # No vertical offset
-                        self.follow_distance * math.sin(orbit_angle)
+                    # Good distance, orbit around target at flight altitude
+                    # (no vertical offset)
+                    orbit_cos, orbit_sin = orbit_phase(self.last_update_time)
+                    self.target_position.set(
+                        target_pos.x + follow_distance * orbit_cos,
+                        60,
+                        target_pos.z + follow_distance * orbit_sin
                     )
-                    # Orbit at flight altitude above target
-                    target_at_altitude = Vector3(target_entity.position.x, 60, target_entity.position.z)
-                    self.target_position = target_at_altitude + orbit_offset
             else:
                 # Target doesn't exist or is destroyed - stay in follow_target mode
                 # Don't automatically switch modes - wait for user to assign new target or change mode
@@ -223,23 +309,23 @@ class Drone(Entity):
             teammate = self._state_manager.get_entity(self.teammate_entity_id)
             if teammate and not teammate.destroyed:
                 # Formation flying - stay behind and to the side
-                import math
-                formation_offset = Vector3(-20, 15, 5)  # Behind and to the right
+                offset_x, offset_y, offset_z = -20.0, 15.0, 5.0  # Behind and to the right
                 
                 # Rotate offset based on teammate's heading
-                if hasattr(teammate, 'heading'):
-                    cos_h = math.cos(teammate.heading)
-                    sin_h = math.sin(teammate.heading)
-                    rotated_offset = Vector3(
-                        formation_offset.x * cos_h - formation_offset.y * sin_h,
-                        formation_offset.x * sin_h + formation_offset.y * cos_h,
-                        formation_offset.z
-                    )
-                    formation_pos = teammate.position + rotated_offset
-                    self.target_position = Vector3(formation_pos.x, max(60, teammate.position.y, self.position.y), formation_pos.z)
-                else:
-                    formation_pos = teammate.position + formation_offset
-                    self.target_position = Vector3(formation_pos.x, max(60, teammate.position.y, self.position.y), formation_pos.z)
+                # (every Entity has a heading slot, so no capability check is needed)
+                cos_h = cos(teammate.heading)
+                sin_h = sin(teammate.heading)
+                offset_x, offset_y = (
+                    offset_x * cos_h - offset_y * sin_h,
+                    offset_x * sin_h + offset_y * cos_h
+                )
+                
+                teammate_pos = teammate.position
+                self.target_position.set(
+                    teammate_pos.x + offset_x,
+                    max(60, teammate_pos.y, self.position.y),
+                    teammate_pos.z + offset_z
+                )
             else:
                 # Teammate doesn't exist or is destroyed - stay in follow_teammate mode
                 # Don't automatically switch modes - wait for user to assign new teammate or change mode
@@ -272,22 +358,26 @@ class Drone(Entity):
         if not self.target_entity_id:
             # Hunt mode - look for nearest target
             if self._state_manager:
-                targets = self._state_manager.get_entities_by_type("target")
+                # Spatial index query only returns targets within hunting range
+                targets = self._state_manager.get_spatial_index("target").query(
+                    self.position, self.hunting_range
+                )
                 nearest_target = None
-                nearest_distance = float('inf')
+                nearest_distance_sq = float('inf')
+                position = self.position
                 
                 for target in targets:
                     if target.destroyed:
                         continue
-                    distance = self.distance_to(target)
-                    if distance < nearest_distance and distance <= self.hunting_range:
+                    distance_sq = position.distance_squared_to(target.position)
+                    if distance_sq < nearest_distance_sq:
                         nearest_target = target
-                        nearest_distance = distance
+                        nearest_distance_sq = distance_sq
                 
                 if nearest_target:
                     self.set_target_entity(nearest_target.id)
                     # Hunt targets from altitude (maintain flight altitude)
-                    self.target_position = Vector3(nearest_target.position.x, max(60, self.position.y), nearest_target.position.z)
+                    self.target_position.set(nearest_target.position.x, max(60, self.position.y), nearest_target.position.z)
                 else:
                     # No targets in range, patrol randomly
                     self._update_random_search(delta_time)
@@ -298,11 +388,18 @@ class Drone(Entity):
                 target_entity = self._state_manager.get_entity(self.target_entity_id)
                 if target_entity and not target_entity.destroyed:
                     # Attack from above (maintain flight altitude)
-                    self.target_position = Vector3(target_entity.position.x, 60, target_entity.position.z)
+                    target_pos = target_entity.position
+                    self.target_position.set(target_pos.x, 60, target_pos.z)
                     
-                    # Check if close enough to engage
-                    distance_to_target = self.distance_to(target_entity)
-                    if distance_to_target <= self.engagement_range:
+                    # Check if close enough to engage (sqrt only for the event log)
+                    position = self.position
+                    dx = target_pos.x - position.x
+                    dy = target_pos.y - position.y
+                    dz = target_pos.z - position.z
+                    distance_sq = dx * dx + dy * dy + dz * dz
+                    engagement_range = self.engagement_range
+                    if engagement_range >= 0 and distance_sq <= engagement_range * engagement_range:
+                        distance_to_target = sqrt(distance_sq)
                         # Kamikaze attack - destroy both entities
                         target_entity.take_damage(1.0)  # Destroy target
                         self.take_damage(1.0)  # Destroy self
@@ -323,53 +420,38 @@ class Drone(Entity):
     def _update_hold_position(self, delta_time: float) -> None:
         """Hold Position: Stationary defensive posture."""
         # Truly hold position - no movement at all
-        self.velocity = Vector3(0, 0, 0)
+        self.velocity.set(0.0, 0.0, 0.0)
         # Don't update target_position to prevent drift
-        self.target_position = self.position
+        # (copy the components, since position is integrated in place)
+        position = self.position
+        self.target_position.set(position.x, position.y, position.z)
+    
+    # Behavior update per mode, dispatched with one dict lookup per tick
+    _MODE_UPDATES = {
+        "random_search": _update_random_search,
+        "follow_target": _update_follow_target,
+        "follow_teammate": _update_follow_teammate,
+        "waypoint_mode": _update_waypoint_mode,
+        "kamikaze": _update_kamikaze,
+        "hold_position": _update_hold_position
+    }
     
     def _move_towards_target(self, delta_time: float) -> None:
         """Move towards target position with realistic flight dynamics."""
-        direction = self.target_position - self.position
-        distance = direction.magnitude()
-        
-        
-        if distance < self.approach_threshold:
-            # Close enough, reduce speed
-            self.velocity = self.velocity * 0.8
-            return
-        
-        # Calculate desired direction
-        if distance > 0:
-            desired_direction = direction.normalize()
-            
-            # Update heading towards target
-            target_heading = math.atan2(desired_direction.y, desired_direction.x)
-            heading_diff = target_heading - self.heading
-            
-            # Normalize angle difference
-            while heading_diff > math.pi:
-                heading_diff -= 2 * math.pi
-            while heading_diff < -math.pi:
-                heading_diff += 2 * math.pi
-            
-            # Turn towards target
-            max_turn = self.turn_rate * delta_time
-            if abs(heading_diff) > max_turn:
-                self.heading += max_turn if heading_diff > 0 else -max_turn
-            else:
-                self.heading = target_heading
-            
-            # Calculate velocity in 3D space
-            speed = min(self.max_speed, distance * 0.5)  # Slow down when close, cap at max_speed
-            self.velocity = Vector3(
-                desired_direction.x * speed,
-                desired_direction.y * speed * 0.8,  # Slightly slower vertical movement
-                desired_direction.z * speed
-            )
+        position = self.position
+        target = self.target_position
+        velocity = self.velocity
+        velocity.x, velocity.y, velocity.z, self.heading = steer_towards(
+            position.x, position.y, position.z,
+            target.x, target.y, target.z,
+            velocity.x, velocity.y, velocity.z, self.heading,
+            self.max_speed, self.turn_rate, self.approach_threshold, delta_time
+        )
     
     def _is_at_target(self) -> bool:
         """Check if drone is at target position."""
-        return self.position.distance_to(self.target_position) < self.approach_threshold
+        approach_threshold = self.approach_threshold
+        return self.position.distance_squared_to(self.target_position) < approach_threshold * approach_threshold
     
     def _update_gimbal_simulation(self, delta_time: float) -> None:
         """Update gimbal angles with realistic simulation patterns (CURRENTLY DISABLED)."""
@@ -410,7 +492,7 @@ class Drone(Entity):
     
     def set_mode(self, mode: str) -> bool:
         """Set drone behavior mode."""
-        if mode in self.valid_modes:
+        if mode in self.VALID_MODES:
             self.current_mode = mode
             return True
         return False
@@ -465,50 +547,34 @@ class Drone(Entity):
     def to_dict(self) -> Dict[str, Any]:
         """Convert drone to dictionary for serialization."""
         data = super().to_dict()
-        data.update({
-            "target_entity_id": self.target_entity_id,
-            "teammate_entity_id": self.teammate_entity_id,
-            "follow_distance": safe_float(self.follow_distance),
-            "kamikaze_enabled": self.kamikaze_enabled,
-            "hunting_range": safe_float(self.hunting_range),
-            "turn_rate": safe_float(self.turn_rate),
-            "approach_threshold": safe_float(self.approach_threshold),
-            "patrol_area_size": safe_float(self.patrol_area_size),
-            "engagement_range": safe_float(self.engagement_range),
-            "valid_modes": self.valid_modes,
-            "visual_state": self.get_visual_state(),
-            
-            # Add sensor data with only dynamic values
-            "sensors": {
-                sensor_id: {
-                    "enabled": sensor_data.get("enabled", True),
-                    "gimbal": {
-                        "pan": safe_float(sensor_data.get("gimbal", {}).get("pan", 0.0)),
-                        "tilt": safe_float(sensor_data.get("gimbal", {}).get("tilt", -15.0))
-                    }
+        data["target_entity_id"] = self.target_entity_id
+        data["teammate_entity_id"] = self.teammate_entity_id
+        data["kamikaze_enabled"] = self.kamikaze_enabled
+        for name in self._SERIALIZED_FLOAT_FIELDS:
+            data[name] = safe_float(getattr(self, name))
+        data["valid_modes"] = self.valid_modes
+        data["visual_state"] = self.get_visual_state()
+        
+        # Add sensor data with only dynamic values
+        sensors = {}
+        for sensor_id, sensor_data in self.sensors.items():
+            gimbal = sensor_data.get("gimbal", {})
+            sensors[sensor_id] = {
+                "enabled": sensor_data.get("enabled", True),
+                "gimbal": {
+                    "pan": safe_float(gimbal.get("pan", 0.0)),
+                    "tilt": safe_float(gimbal.get("tilt", -15.0))
                 }
-                for sensor_id, sensor_data in self.sensors.items()
             }
-        })
+        data["sensors"] = sensors
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Drone':
         """Create drone from dictionary."""
-        drone = cls(
-            entity_id=data.get("id"),
-            position=Vector3(**data.get("position", {}))
-        )
-        
-        # Set base properties
-        base_data = {k: v for k, v in data.items() if k not in [
-            "target_entity_id", "teammate_entity_id", "follow_distance", 
-            "kamikaze_enabled", "hunting_range", "turn_rate", 
-            "approach_threshold", "patrol_area_size", "engagement_range"
-        ]}
-        drone = Entity.from_dict(base_data)
-        drone.__class__ = cls
-        drone.entity_type = "drone"
+        # Base properties (Entity.from_dict ignores the drone-specific keys
+        # and constructs the drone exactly once)
+        drone = super().from_dict(data)
         
         # Set drone-specific properties
         drone.target_entity_id = data.get("target_entity_id")
@@ -3,9 +3,14 @@ Target entity (tank, car, infantry, SAM, ship, jammer, etc.) detectable by frien
 May move and can be targeted by drones. Displayed in the GUI with state-aware visuals.
 """
 
+import math
+import random
 import time
 from typing import Optional, Dict, Any
-from .base import Entity, Vector3, safe_float
+from .base import Entity, Vector3, safe_float, safe_vector_dict
+
+# Seconds after the last sighting before a detection counts as stale
+STALE_DETECTION_THRESHOLD = 60.0
 
 
 class Target(Entity):
@@ -26,6 +31,29 @@ class Target(Entity):
     - Black "X": Destruction marker overlay
     """
     
+    __slots__ = (
+        "observed_velocity", "last_seen_time", "confidence",
+        "role", "affiliation",
+        "is_moving", "is_targeted",
+        "patrol_speed", "turn_rate", "approach_threshold",
+        "_last_micro_movement", "_patrol_waypoint_timer", "_patrol_waypoint_interval",
+        "detection_time", "detection_count",
+    )
+    
+    # Valid behavior modes (only in simulation/training, shared by all targets)
+    valid_modes = (
+        "waypoint_mode",
+        "hold_position"
+    )
+    VALID_MODES = frozenset(valid_modes)  # for O(1) membership checks
+    
+    # Valid classifications
+    VALID_ROLES = frozenset((
+        "unknown", "tank", "car", "infantry", "SAM",
+        "ship", "jammer", "building", "bunker"
+    ))
+    VALID_AFFILIATIONS = frozenset(("hostile", "neutral", "friendly", "unknown"))
+    
     def __init__(self, entity_id: Optional[str] = None, position: Optional[Vector3] = None, **kwargs):
         super().__init__(entity_id, position)
         self.entity_type = "target"
@@ -58,21 +86,15 @@ class Target(Entity):
         self._patrol_waypoint_timer = 0.0
         self._patrol_waypoint_interval = 30.0  # Change direction every 30 seconds
         
-        # Valid behavior modes (only in simulation/training)
-        self.valid_modes = [
-            "waypoint_mode",
-            "hold_position"
-        ]
-        
         self.current_mode = "hold_position"  # Default mode
         
         # Detection state
         self.detection_time: float = 0.0  # When first detected
         self.detection_count: int = 0  # Number of times detected
     
-    def update(self, delta_time: float) -> None:
+    def update(self, delta_time: float, now: Optional[float] = None) -> None:
         """Update target state based on current behavior mode."""
-        super().update(delta_time)
+        super().update(delta_time, now)
         
         # Enforce ground level constraint - targets stay at ground level (y=0)
         if self.position.y != 0:
@@ -106,8 +128,6 @@ class Target(Entity):
                 self.target_position = next_waypoint
             else:
                 # Generate random waypoint near current position
-                import random
-                import math
                 angle = random.uniform(0, 2 * math.pi)
                 distance = random.uniform(20, 100)  # 20-100m patrol range
                 
@@ -123,13 +143,12 @@ class Target(Entity):
     
     def _update_hold_position(self, delta_time: float) -> None:
         """Hold Position: Defensive stationary posture."""
-        # Stop movement
-        self.velocity = Vector3(0, 0, 0)
+        # Stop movement (in place, this runs every tick)
+        self.velocity.set(0.0, 0.0, 0.0)
         
         # Small random movement for realism every 30 seconds
-        current_time = time.time()
+        current_time = self.last_update_time  # tick timestamp
         if current_time - self._last_micro_movement > 30.0:
-            import random
             # Small random adjustment (1-3 meters) - stay on ground
             self.target_position = Vector3(
                 self.position.x + random.uniform(-3, 3),
@@ -144,31 +163,27 @@ class Target(Entity):
     
     def _move_towards_target(self, delta_time: float) -> None:
         """Move towards target position with ground vehicle dynamics."""
-        direction = self.target_position - self.position
-        distance = direction.magnitude()
+        # Scalar math on the components; velocity is updated in place
+        position = self.position
+        target_position = self.target_position
+        dx = target_position.x - position.x
+        dy = target_position.y - position.y
+        dz = target_position.z - position.z
+        distance_sq = dx * dx + dy * dy + dz * dz
+        approach_threshold = self.approach_threshold
         
-        if distance < self.approach_threshold:
+        if distance_sq < approach_threshold * approach_threshold:
             # Close enough, stop
-            self.velocity = Vector3(0, 0, 0)
+            self.velocity.set(0.0, 0.0, 0.0)
             return
         
         # Calculate desired direction (ground movement only)
-        if distance > 0:
-            desired_direction = direction.normalize()
-            
-            # Ground vehicles move in 2D
-            desired_direction.z = 0
-            
-            # Update heading towards target
-            import math
-            target_heading = math.atan2(desired_direction.y, desired_direction.x)
-            heading_diff = target_heading - self.heading
-            
-            # Normalize angle difference
-            while heading_diff > math.pi:
-                heading_diff -= 2 * math.pi
-            while heading_diff < -math.pi:
-                heading_diff += 2 * math.pi
+        if distance_sq > 0:
+            # Update heading towards target (atan2 only needs the ratio of
+            # the raw delta, so the direction is not normalized first)
+            target_heading = math.atan2(dy, dx)
+            # Normalize angle difference into [-pi, pi] in one step
+            heading_diff = math.remainder(target_heading - self.heading, 2 * math.pi)
             
             # Turn towards target (slower than drones)
             max_turn = self.turn_rate * delta_time
@@ -178,35 +193,41 @@ class Target(Entity):
                 self.heading = target_heading
             
             # Calculate velocity based on heading
-            speed = min(self.patrol_speed, distance)
-            self.velocity = Vector3(
-                speed * math.cos(self.heading),
-                speed * math.sin(self.heading),
-                0  # Ground level
+            heading = self.heading
+            speed = min(self.patrol_speed, math.sqrt(distance_sq))
+            self.velocity.set(
+                speed * math.cos(heading),
+                speed * math.sin(heading),
+                0.0  # Ground level
             )
     
     def _is_at_target(self) -> bool:
         """Check if target is at target position."""
-        return self.position.distance_to(self.target_position) < self.approach_threshold
+        approach_threshold = self.approach_threshold
+        return self.position.distance_squared_to(self.target_position) < approach_threshold * approach_threshold
     
     def set_mode(self, mode: str) -> bool:
         """Set target behavior mode (simulation/training only)."""
-        if mode in self.valid_modes:
+        if mode in self.VALID_MODES:
             self.current_mode = mode
             return True
         return False
     
-    def mark_detected(self, detector_id: str, confidence: float = 1.0) -> None:
+    def mark_detected(self, detector_id: str, confidence: float = 1.0,
+                      now: Optional[float] = None) -> None:
         """Mark target as detected by friendly asset."""
+        if now is None:
+            now = time.time()
+        
         if not self.detected:
-            self.detection_time = time.time()
+            self.detection_time = now
             self.detection_count = 1
         else:
             self.detection_count += 1
         
         self.detected = True
         self.confidence = max(self.confidence, confidence)
-        self.last_seen_time = time.time()
+        self.last_seen_time = now
     
     def mark_targeted(self, targeted: bool = True) -> None:
         """Mark target as being targeted by drones."""
@@ -214,17 +235,12 @@ class Target(Entity):
     
     def set_role(self, role: str) -> None:
         """Set target role/classification."""
-        valid_roles = [
-            "unknown", "tank", "car", "infantry", "SAM", 
-            "ship", "jammer", "building", "bunker"
-        ]
-        if role in valid_roles:
+        if role in self.VALID_ROLES:
             self.role = role
     
     def set_affiliation(self, affiliation: str) -> None:
         """Set target affiliation."""
-        valid_affiliations = ["hostile", "neutral", "friendly", "unknown"]
-        if affiliation in valid_affiliations:
+        if affiliation in self.VALID_AFFILIATIONS:
             self.affiliation = affiliation
     
     def update_observed_velocity(self, velocity: Vector3) -> None:
@@ -249,53 +265,38 @@ class Target(Entity):
             return float('inf')
         return time.time() - self.last_seen_time
     
-    def is_stale_detection(self, threshold: float = 60.0) -> bool:
+    def is_stale_detection(self, threshold: float = STALE_DETECTION_THRESHOLD) -> bool:
         """Check if detection is stale (older than threshold seconds)."""
         return self.get_time_since_detection() > threshold
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert target to dictionary for serialization."""
         data = super().to_dict()
-        data.update({
-            "observed_velocity": {
-                "x": safe_float(self.observed_velocity.x),
-                "y": safe_float(self.observed_velocity.y), 
-                "z": safe_float(self.observed_velocity.z)
-            },
-            "last_seen_time": safe_float(self.last_seen_time),
-            "confidence": safe_float(self.confidence),
-            "role": self.role,
-            "affiliation": self.affiliation,
-            "is_moving": self.is_moving,
-            "is_targeted": self.is_targeted,
-            "patrol_speed": safe_float(self.patrol_speed),
-            "turn_rate": safe_float(self.turn_rate),
-            "approach_threshold": safe_float(self.approach_threshold),
-            "detection_time": safe_float(self.detection_time),
-            "detection_count": self.detection_count,
-            "visual_state": self.get_visual_state(),
-            "time_since_detection": self.get_time_since_detection(),
-            "is_stale_detection": self.is_stale_detection()
-        })
+        data["observed_velocity"] = safe_vector_dict(self.observed_velocity)
+        data["last_seen_time"] = safe_float(self.last_seen_time)
+        data["confidence"] = safe_float(self.confidence)
+        data["role"] = self.role
+        data["affiliation"] = self.affiliation
+        data["is_moving"] = self.is_moving
+        data["is_targeted"] = self.is_targeted
+        data["patrol_speed"] = safe_float(self.patrol_speed)
+        data["turn_rate"] = safe_float(self.turn_rate)
+        data["approach_threshold"] = safe_float(self.approach_threshold)
+        data["detection_time"] = safe_float(self.detection_time)
+        data["detection_count"] = self.detection_count
+        data["visual_state"] = self.get_visual_state()
+        # One clock read serves both detection-age fields
+        time_since_detection = self.get_time_since_detection()
+        data["time_since_detection"] = safe_float(time_since_detection)
+        data["is_stale_detection"] = time_since_detection > STALE_DETECTION_THRESHOLD
         return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Target':
         """Create target from dictionary."""
-        target = cls(
-            entity_id=data.get("id"),
-            position=Vector3(**data.get("position", {}))
-        )
-        
-        # Set base properties
-        base_data = {k: v for k, v in data.items() if k not in [
-            "observed_velocity", "last_seen_time", "confidence", "role", 
-            "affiliation", "is_moving", "is_targeted", "patrol_speed",
-            "turn_rate", "approach_threshold", "detection_time", "detection_count"
-        ]}
-        target = Entity.from_dict(base_data)
-        target.__class__ = cls
-        target.entity_type = "target"
+        # Base properties (Entity.from_dict ignores the target-specific keys
+        # and constructs the target exactly once)
+        target = super().from_dict(data)
         
         # Set target-specific properties
         observed_vel_data = data.get("observed_velocity", {})
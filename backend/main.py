@@ -6,7 +6,7 @@ Serves frontend static files.
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse
 from typing import Dict, Set
 import asyncio
 import json
@@ -31,7 +31,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="BGCS Backend", 
     version="1.0.0",
-    description="UAV Ground Control Station Backend API"
+    description="UAV Ground Control Station Backend API",
+    default_response_class=ORJSONResponse
 )
 
 # Initialize simulation engine
@@ -52,6 +53,8 @@ set_websocket_simulation_engine(simulation_engine)
 async def startup_event():
     """Start the simulation engine on app startup."""
     logger.info("Starting BGCS simulation engine...")
+    # uvicorn's default loop="auto" picks uvloop when it is installed (not available on Windows)
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
     
     # Set state manager references for entities
     def setup_entity_state_manager(entity):
@@ -8,7 +8,7 @@ import time
 import logging
 import math
 import random
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from ..state.manager import StateManager
 from ..entities.base import Entity, Vector3
 from ..entities.drone import Drone
@@ -49,6 +49,9 @@ class SimulationEngine:
         self.current_fps = 0.0
         self.frame_times: List[float] = []
         self.max_frame_times = 60  # Keep last 60 frame times
+        # Frame time stats (avg, max) in ms, published together with the FPS
+        self.frame_time_stats: Tuple[float, float] = (0.0, 0.0)
+        self.stats_revision = 0  # Bumped when published stats (FPS, frame times, run state, speed) change
         
         # Entity management
         self.spawn_queue: List[Dict] = []
@@ -72,11 +75,13 @@ class SimulationEngine:
         self.frame_count = 0
         self.last_fps_time = time.time()
         self.frame_times.clear()
+        self.frame_time_stats = (0.0, 0.0)
         
         # Start the simulation task
         self.simulation_task = asyncio.create_task(self._simulation_loop())
         
         self.state_manager.start_simulation()
+        self.stats_revision += 1
         logger.info("Simulation started")
         return True
     
@@ -97,23 +102,27 @@ class SimulationEngine:
             self.simulation_task = None
         
         self.state_manager.stop_simulation()
+        self.stats_revision += 1
         logger.info("Simulation stopped")
         return True
     
     def pause(self) -> None:
         """Pause the simulation."""
         self.paused = True
+        self.stats_revision += 1
         logger.info("Simulation paused")
     
     def resume(self) -> None:
         """Resume the simulation."""
         self.paused = False
+        self.stats_revision += 1
         logger.info("Simulation resumed")
     
     def set_speed_multiplier(self, multiplier: float) -> None:
         """Set simulation speed multiplier."""
         self.speed_multiplier = max(0.1, min(10.0, multiplier))
         self.state_manager.set_simulation_speed(self.speed_multiplier)
+        self.stats_revision += 1
         logger.info(f"Simulation speed set to {self.speed_multiplier}x")
     
     async def _simulation_loop(self) -> None:
@@ -185,10 +194,14 @@ class SimulationEngine:
             position = spawn_data.get("position", Vector3(0, 0, 0))
             properties = spawn_data.get("properties", {})
             
-            # Create entity
-            entity = self.state_manager.create_entity(
-                entity_type, entity_id, position, **properties
-            )
+            # Create entity (a bad spawn request must not stop the simulation loop)
+            try:
+                entity = self.state_manager.create_entity(
+                    entity_type, entity_id, position, **properties
+                )
+            except Exception as e:
+                logger.error(f"Failed to spawn {entity_type} {entity_id}: {e}")
+                continue
             
             if entity:
                 self.state_manager.log_event("entity_spawned", entity.id, {
@@ -199,13 +212,17 @@ class SimulationEngine:
     
     def _update_entities(self, delta_time: float) -> None:
         """Update all entities."""
+        now = time.time()  # one clock read shared by every entity this tick
         for entity in list(self.state_manager.entities.values()):
             if not entity.destroyed:
-                entity.update(delta_time)
+                entity.update(delta_time, now)
                 
                 # Check for out-of-bounds entities
                 if self._is_entity_out_of_bounds(entity):
                     self._handle_out_of_bounds_entity(entity)
+        
+        # Positions changed: invalidate the spatial indexes and state snapshot
+        self.state_manager.advance_tick()
     
     def _update_detection_system(self) -> None:
         """Update entity detection system."""
@@ -217,33 +234,34 @@ class SimulationEngine:
         
         self.last_detection_check = current_time
         
-        # Get all drones and targets
+        # Get all drones, and the target spatial index. _update_entities has
+        # advanced the tick, so the index is rebuilt from this tick's positions;
+        # fetch it once, since logging detections below bumps the revision
         drones = self.state_manager.get_entities_by_type("drone")
-        targets = self.state_manager.get_entities_by_type("target")
+        target_index = self.state_manager.get_spatial_index("target")
         
         # Check drone detection of targets
         for drone in drones:
             if drone.destroyed:
                 continue
-                
-            for target in targets:
+            
+            # Only targets within the drone's detection range are returned
+            for target in target_index.query(drone.position, drone.detection_radius):
                 if target.destroyed:
                     continue
                 
-                distance = drone.distance_to(target)
-                if distance <= drone.detection_radius:
-                    # Target detected
-                    if not target.detected:
-                        target.mark_detected(drone.id, confidence=0.8)
-                        self.state_manager.log_event("target_detected", target.id, {
-                            "detector": drone.id,
-                            "distance": distance,
-                            "confidence": 0.8
-                        })
-                        logger.debug(f"Drone {drone.id} detected target {target.id}")
-                    
-                    # Target detected but don't automatically change drone behavior
-                    # Drones will maintain their current mode and won't auto-switch to follow_target
+                # Target detected
+                if not target.detected:
+                    target.mark_detected(drone.id, confidence=0.8, now=current_time)
+                    self.state_manager.log_event("target_detected", target.id, {
+                        "detector": drone.id,
+                        "distance": drone.distance_to(target),
+                        "confidence": 0.8
+                    })
+                    logger.debug(f"Drone {drone.id} detected target {target.id}")
+                
+                # Target detected but don't automatically change drone behavior
+                # Drones will maintain their current mode and won't auto-switch to follow_target
     
     def _process_destroy_queue(self) -> None:
         """Process entity destruction requests."""
@@ -291,8 +309,16 @@ class SimulationEngine:
             self.frame_count = 0
             self.last_fps_time = current_time
             
+            # Publish frame times alongside the FPS so stats_revision covers them
+            frame_times = self.frame_times
+            self.frame_time_stats = (
+                sum(frame_times) / len(frame_times) * 1000,  # Convert to ms
+                max(frame_times) * 1000
+            )
+            
             # Update state manager FPS
             self.state_manager.fps = self.current_fps
+            self.stats_revision += 1
     
     # Public API methods
     
@@ -368,17 +394,16 @@ class SimulationEngine:
         logger.info(f"Spawned test scenario: {num_drones} drones, {num_targets} targets")
     
     def get_performance_stats(self) -> Dict[str, float]:
-        """Get current performance statistics."""
-        avg_frame_time = sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0
-        max_frame_time = max(self.frame_times) if self.frame_times else 0
+        """Get current performance statistics (frame times refresh with the FPS, once per second)."""
+        avg_frame_time, max_frame_time = self.frame_time_stats
         
         return {
             "fps": self.current_fps,
             "target_fps": self.target_fps,
             "speed_multiplier": self.speed_multiplier,
             "entity_count": len(self.state_manager.entities),
-            "avg_frame_time": avg_frame_time * 1000,  # Convert to ms
-            "max_frame_time": max_frame_time * 1000,  # Convert to ms
+            "avg_frame_time": avg_frame_time,
+            "max_frame_time": max_frame_time,
             "running": self.running,
             "paused": self.paused
         }
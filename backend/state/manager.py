@@ -8,9 +8,11 @@ import uuid
 import math
 import json
 import os
-from typing import Dict, List, Optional, Any, Type
+import orjson
+from types import MemberDescriptorType
+from typing import Dict, List, Optional, Any, Tuple, Type
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 def safe_float(value: float) -> float:
     """Convert float to JSON-safe value, handling inf and NaN."""
@@ -23,6 +25,7 @@ def safe_float(value: float) -> float:
 from ..entities.base import Entity, Vector3
 from ..entities.drone import Drone
 from ..entities.target import Target
+from .spatial import SpatialHash
 
 
 @dataclass
@@ -68,14 +71,27 @@ class EntityGroup:
     created_time: float
     sort_index: int = 0
     
+    # Serialization cache, invalidated by bumping _version on every mutation
+    _version: int = field(default=0, repr=False, compare=False)
+    _cached_dict: Optional[Tuple[int, Dict[str, Any]]] = field(default=None, repr=False, compare=False)
+    
+    def mark_changed(self) -> None:
+        """Invalidate the cached dictionary after a mutation."""
+        self._version += 1
+    
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        if self._cached_dict is not None and self._cached_dict[0] == self._version:
+            return self._cached_dict[1]
+        
+        data = {
             "id": self.id,
             "name": self.name,
-            "members": self.members,
+            "members": list(self.members),
             "created_time": safe_float(self.created_time),
             "sort_index": self.sort_index
         }
+        self._cached_dict = (self._version, data)
+        return data
 
 
 class StateManager:
@@ -98,6 +114,7 @@ class StateManager:
     def __init__(self, max_events: int = 1000, max_messages: int = 500):
         # Core state
         self.entities: Dict[str, Entity] = {}
+        self.entity_counts: Dict[str, int] = {}  # Maintained on add/remove
         self.selected_entities: List[str] = []
         self.groups: Dict[str, EntityGroup] = StateManager._persistent_groups
         
@@ -122,6 +139,12 @@ class StateManager:
         self.update_count: int = 0
         self.last_fps_update: float = time.time()
         
+        # Snapshot cache for read-only API requests and broadcasts, keyed on the
+        # (tick, revision) stamp it was built at (see advance_tick / revision)
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_json: Optional[bytes] = None
+        self._snapshot_stamp: Optional[Tuple[int, int]] = None
+        
         # Terrain grid (simplified 2D grid for movement)
         self.terrain_width: int = 1000  # meters
         self.terrain_height: int = 1000  # meters
@@ -132,6 +155,21 @@ class StateManager:
         self.group_order = StateManager._persistent_group_order
         
         
+        # Monotonic revision, bumped on every logged event or chat message
+        # (covers spawn/destroy, mode/path, selection, groups, simulation
+        # control) and on display order changes
+        self.revision: int = 0
+        
+        # JSON-encoded selected_entities, keyed on the revision it was built at
+        self._selection_json: Optional[Tuple[int, bytes]] = None
+        
+        # Per-type spatial indexes for radius queries, rebuilt lazily once per
+        # tick (or when entities are added/removed, which bumps the revision).
+        # The tick advances whenever entities have moved, see advance_tick()
+        self.tick: int = 0
+        self.spatial_cell_size: float = 200.0  # meters (default drone hunting range)
+        self._spatial_indexes: Dict[str, Tuple[Tuple[int, int], SpatialHash]] = {}
+        
         # Statistics
         self.stats = {
             "entities_created": 0,
@@ -152,6 +190,7 @@ class StateManager:
             entity.sort_index = self.entity_order[entity.id]
         
         self.entities[entity.id] = entity
+        self.entity_counts[entity.entity_type] = self.entity_counts.get(entity.entity_type, 0) + 1
         self.stats["entities_created"] += 1
         
         self.log_event("entity_created", entity.id, {
@@ -166,8 +205,10 @@ class StateManager:
         if entity_id not in self.entities:
             return False
         
-        entity = self.entities[entity_id]
-        del self.entities[entity_id]
+        entity = self.entities.pop(entity_id)
+        self.entity_counts[entity.entity_type] -= 1
+        if not self.entity_counts[entity.entity_type]:
+            del self.entity_counts[entity.entity_type]
         
         # Remove from selection if selected
         if entity_id in self.selected_entities:
@@ -200,8 +241,11 @@ class StateManager:
         entity = entity_class(entity_id, position, **kwargs)
         
         # Set additional properties that weren't handled in constructor
+        # (only per-instance slots; class-level constants such as valid_modes
+        # are read-only on slotted entities and unknown names are ignored)
         for key, value in kwargs.items():
-            if hasattr(entity, key) and getattr(entity, key) != value:
+            if (isinstance(getattr(entity_class, key, None), MemberDescriptorType)
+                    and getattr(entity, key, None) != value):
                 setattr(entity, key, value)
         
         if self.add_entity(entity):
@@ -210,13 +254,24 @@ class StateManager:
     
     def update_entities(self, delta_time: float) -> None:
         """Update all entities."""
+        now = time.time()  # one clock read shared by every entity this tick
         for entity in list(self.entities.values()):
             if not entity.destroyed:
-                entity.update(delta_time)
+                entity.update(delta_time, now)
             else:
                 # Remove destroyed entities after a delay
-                if time.time() - entity.last_update_time > 5.0:  # 5 second delay
+                if now - entity.last_update_time > 5.0:  # 5 second delay
                     self.remove_entity(entity.id)
+        # Stamp after moving, so an index built mid-pass is not reused next pass
+        self.advance_tick()
+    
+    def advance_tick(self) -> None:
+        """Mark entity positions/state as changed, invalidating per-tick caches.
+        
+        Call after integrating entities (or moving them outside the simulation
+        step) so spatial indexes and state snapshots are rebuilt on next use.
+        """
+        self.tick += 1
     
     # Selection Management
     
@@ -250,6 +305,38 @@ class StateManager:
         self.selected_entities.clear()
         self.log_event("selection_cleared")
     
+    def set_selection(self, entity_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """Replace the selection in one pass. Returns (added, removed) entity IDs."""
+        requested = [entity_id for entity_id in dict.fromkeys(entity_ids) if entity_id in self.entities]
+        new_ids = set(requested)
+        old_ids = set(self.selected_entities)
+        
+        added = [entity_id for entity_id in requested if entity_id not in old_ids]
+        removed = [entity_id for entity_id in self.selected_entities if entity_id not in new_ids]
+        
+        for entity_id in removed:
+            if entity_id in self.entities:
+                self.entities[entity_id].selected = False
+        for entity_id in added:
+            self.entities[entity_id].selected = True
+        
+        # Keep existing selection order, newly selected entities go last
+        self.selected_entities = [entity_id for entity_id in self.selected_entities if entity_id in new_ids] + added
+        
+        if added or removed:
+            self.log_event("selection_changed", data={"added": added, "removed": removed})
+        
+        return added, removed
+    
+    def get_selected_entities_json(self) -> bytes:
+        """Get JSON-encoded selected entity IDs, re-encoded only after the state changes."""
+        # Every selection change logs an event, which bumps the revision
+        cached = self._selection_json
+        if cached is None or cached[0] != self.revision:
+            cached = (self.revision, orjson.dumps(self.selected_entities))
+            self._selection_json = cached
+        return cached[1]
+    
     def get_selected_entities(self) -> List[Entity]:
         """Get all selected entities."""
         return [self.entities[entity_id] for entity_id in self.selected_entities 
@@ -269,6 +356,7 @@ class StateManager:
         
         self.events.append(event)
         self.stats["events_logged"] += 1
+        self.revision += 1
     
     def get_recent_events(self, count: int = 10) -> List[SimulationEvent]:
         """Get recent events."""
@@ -293,6 +381,7 @@ class StateManager:
         
         self.chat_messages.append(chat_message)
         self.stats["messages_sent"] += 1
+        self.revision += 1
     
     def get_recent_messages(self, count: int = 50) -> List[ChatMessage]:
         """Get recent chat messages."""
@@ -353,6 +442,24 @@ class StateManager:
             "recent_messages": [msg.to_dict() for msg in self.get_recent_messages(10)]
         }
     
+    def get_cached_state_snapshot(self) -> Tuple[Dict[str, Any], bytes]:
+        """Get state snapshot and its JSON encoding, rebuilt once per tick or mutation.
+
+        The cache is keyed on (tick, revision), so a read after any mutation
+        sees it. The returned dict is shared between callers (including the
+        msgpack encoder) and must not be modified.
+        """
+        stamp = (self.tick, self.revision)
+        if self._snapshot_json is None or self._snapshot_stamp != stamp:
+            self._snapshot = self.get_state_snapshot()
+            self._snapshot_json = orjson.dumps(self._snapshot)
+            self._snapshot_stamp = stamp
+        return self._snapshot, self._snapshot_json
+    
+    def get_state_snapshot_json(self) -> bytes:
+        """Get JSON-encoded state snapshot, reusing the cached encoding until state changes."""
+        return self.get_cached_state_snapshot()[1]
+    
     def load_state_snapshot(self, snapshot: Dict[str, Any]) -> bool:
         """Load state from snapshot."""
         try:
@@ -368,6 +475,7 @@ class StateManager:
                     entity_class = self.entity_types[entity_type]
                     entity = entity_class.from_dict(entity_data)
                     self.entities[entity_id] = entity
+            self._recount_entities()
             
             # Load other state
             self.selected_entities = snapshot.get("selected_entities", [])
@@ -390,23 +498,46 @@ class StateManager:
     
     def get_entity_count_by_type(self) -> Dict[str, int]:
         """Get entity count by type."""
+        return self.entity_counts.copy()
+    
+    def _recount_entities(self) -> None:
+        """Rebuild the per-type entity counts after bulk changes to the entity dict."""
         counts = {}
         for entity in self.entities.values():
             entity_type = entity.entity_type
             counts[entity_type] = counts.get(entity_type, 0) + 1
-        return counts
+        self.entity_counts = counts
     
     def find_entities_in_radius(self, center: Vector3, radius: float) -> List[Entity]:
         """Find all entities within radius of center point."""
         entities_in_radius = []
+        radius_sq = radius * radius
         for entity in self.entities.values():
-            if entity.position.distance_to(center) <= radius:
+            if entity.position.distance_squared_to(center) <= radius_sq:
                 entities_in_radius.append(entity)
         return entities_in_radius
     
+    def get_spatial_index(self, entity_type: str) -> SpatialHash:
+        """Get the spatial index of all entities of a type, rebuilding it if stale.
+        
+        Buckets reflect positions at the last advance_tick(), which the engine
+        and update_entities call after every entity pass.
+        """
+        stamp = (self.tick, self.revision)
+        cached = self._spatial_indexes.get(entity_type)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        
+        index = cached[1] if cached is not None else SpatialHash(self.spatial_cell_size)
+        index.rebuild(entity for entity in self.entities.values()
+                      if entity.entity_type == entity_type)
+        self._spatial_indexes[entity_type] = (stamp, index)
+        return index
+    
     def clear_all_state(self) -> None:
         """Clear all state (entities, events, messages)."""
         self.entities.clear()
+        self.entity_counts.clear()
         self.selected_entities.clear()
         self.events.clear()
         self.chat_messages.clear()
@@ -443,6 +574,7 @@ class StateManager:
         # Apply saved sort_index if it exists
         if group_id in StateManager._persistent_groups:
             group.sort_index = StateManager._persistent_groups[group_id].sort_index
+            group.mark_changed()
         
         # Store in both instance and class variable for persistence
         self.groups[group_id] = group
@@ -461,11 +593,11 @@ class StateManager:
         """Get group by ID."""
         return self.groups.get(group_id)
     
-    def update_group(self, group_id: str, name: Optional[str] = None, members: Optional[List[str]] = None) -> bool:
-        """Update group properties."""
+    def update_group(self, group_id: str, name: Optional[str] = None, members: Optional[List[str]] = None) -> Optional[EntityGroup]:
+        """Update group properties. Returns the updated group, or None if not found."""
         group = self.groups.get(group_id)
         if not group:
-            return False
+            return None
         
         if name is not None:
             group.name = name
@@ -475,6 +607,8 @@ class StateManager:
             valid_members = [member_id for member_id in members if member_id in self.entities]
             group.members = valid_members
         
+        group.mark_changed()
+        
         self.log_event("group_updated", None, {
             "group_id": group_id,
             "group_name": group.name,
@@ -482,15 +616,13 @@ class StateManager:
             "member_count": len(group.members)
         })
         
-        return True
+        return group
     
-    def delete_group(self, group_id: str) -> bool:
-        """Delete a group."""
-        if group_id not in self.groups:
-            return False
-        
-        group = self.groups[group_id]
-        del self.groups[group_id]
+    def delete_group(self, group_id: str) -> Optional[EntityGroup]:
+        """Delete a group. Returns the deleted group, or None if not found."""
+        group = self.groups.pop(group_id, None)
+        if not group:
+            return None
         
         # Remove from class variable for persistence
         if group_id in StateManager._persistent_groups:
@@ -505,41 +637,43 @@ class StateManager:
             "group_name": group.name
         })
         
-        return True
+        return group
     
     def get_all_groups(self) -> List[EntityGroup]:
         """Get all groups."""
         return list(self.groups.values())
     
-    def add_entity_to_group(self, group_id: str, entity_id: str) -> bool:
-        """Add entity to group."""
+    def add_entity_to_group(self, group_id: str, entity_id: str) -> Optional[EntityGroup]:
+        """Add entity to group. Returns the group, or None if group or entity not found."""
         group = self.groups.get(group_id)
         if not group or entity_id not in self.entities:
-            return False
+            return None
         
         if entity_id not in group.members:
             group.members.append(entity_id)
+            group.mark_changed()
             self.log_event("entity_added_to_group", entity_id, {
                 "group_id": group_id,
                 "group_name": group.name
             })
         
-        return True
+        return group
     
-    def remove_entity_from_group(self, group_id: str, entity_id: str) -> bool:
-        """Remove entity from group."""
+    def remove_entity_from_group(self, group_id: str, entity_id: str) -> Optional[EntityGroup]:
+        """Remove entity from group. Returns the group, or None if not found."""
         group = self.groups.get(group_id)
         if not group:
-            return False
+            return None
         
         if entity_id in group.members:
             group.members.remove(entity_id)
+            group.mark_changed()
             self.log_event("entity_removed_from_group", entity_id, {
                 "group_id": group_id,
                 "group_name": group.name
             })
         
-        return True
+        return group
     
     def get_entity_groups(self, entity_id: str) -> List[EntityGroup]:
         """Get all groups that contain the specified entity."""
@@ -559,6 +693,7 @@ class StateManager:
             elif len(valid_members) < len(group.members):
                 # Update group with only valid members
                 group.members = valid_members
+                group.mark_changed()
         
         return empty_groups
     
@@ -570,9 +705,12 @@ class StateManager:
             # Update persistent storage
             if group_id in self._persistent_groups:
                 self._persistent_groups[group_id].sort_index = index
+                self._persistent_groups[group_id].mark_changed()
             # Update current instance if it exists
             if group_id in self.groups:
                 self.groups[group_id].sort_index = index
+                self.groups[group_id].mark_changed()
+        self.revision += 1  # sort_index is part of the state snapshot
     
     def get_group_order(self) -> List[str]:
         """Get the current group display order."""
@@ -601,7 +739,7 @@ class StateManager:
             entity = self.get_entity(entity_id)
             if entity:
                 entity.sort_index = index
-        
+        self.revision += 1  # sort_index is part of the state snapshot
     
     def get_entity_sort_index(self, entity_id: str) -> int:
         """Get the sort index for an entity."""
@@ -0,0 +1,81 @@
+"""
+Uniform grid spatial hash for radius queries over entities.
+Buckets entities by ground-plane (x/z) cell so a query only scans nearby cells.
+"""
+
+from math import ceil, floor
+from typing import Dict, Iterable, List, Tuple
+
+from ..entities.base import Entity, Vector3
+
+
+class SpatialHash:
+    """
+    Uniform grid over the ground (x/z) plane.
+
+    Rebuilt from scratch when positions change (once per simulation tick);
+    queries scan the cells overlapping the search radius and filter the
+    candidates by squared 3D distance against their current positions.
+    """
+
+    __slots__ = ("cell_size", "_inv_cell_size", "cells")
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._inv_cell_size = 1.0 / cell_size
+        self.cells: Dict[Tuple[int, int], List[Entity]] = {}
+
+    def rebuild(self, entities: Iterable[Entity]) -> None:
+        """Re-bucket all entities by their current position."""
+        cells: Dict[Tuple[int, int], List[Entity]] = {}
+        inv_cell_size = self._inv_cell_size
+        for entity in entities:
+            position = entity.position
+            x, z = position.x, position.z
+            if (x - x) + (z - z) != 0:
+                continue  # inf/NaN positions can never be within a radius
+            key = (floor(x * inv_cell_size), floor(z * inv_cell_size))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [entity]
+            else:
+                bucket.append(entity)
+        self.cells = cells
+
+    def query(self, center: Vector3, radius: float) -> List[Entity]:
+        """Find all indexed entities within radius of center point."""
+        result = []
+        cells = self.cells
+        if not cells:
+            return result
+
+        radius_sq = radius * radius
+        inv_cell_size = self._inv_cell_size
+        span = radius * inv_cell_size
+        x, z = center.x, center.z
+
+        if (not span < len(cells)  # also true for inf/NaN radius
+                or (x - x) + (z - z) != 0
+                or (2 * ceil(span) + 1) ** 2 >= len(cells)):
+            # Radius covers more cells than are occupied (or can't be
+            # mapped to cells at all), scan them all
+            buckets = cells.values()
+        else:
+            reach = ceil(span)
+            cx = floor(x * inv_cell_size)
+            cz = floor(z * inv_cell_size)
+            buckets = [
+                cells[key]
+                for key in (
+                    (ix, iz)
+                    for ix in range(cx - reach, cx + reach + 1)
+                    for iz in range(cz - reach, cz + reach + 1)
+                )
+                if key in cells
+            ]
+
+        for bucket in buckets:
+            for entity in bucket:
+                if entity.position.distance_squared_to(center) <= radius_sq:
+                    result.append(entity)
+        return result
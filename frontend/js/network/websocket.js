@@ -7,6 +7,7 @@ class BGCSWebSocketClient {
     constructor(url = null) {
         this.url = url || `ws://${window.location.hostname}:8000/ws`;
         this.websocket = null;
+        this.textDecoder = new TextDecoder();
         this.clientId = null;
         this.connected = false;
         this.connecting = false;
@@ -73,6 +74,8 @@ class BGCSWebSocketClient {
         
         try {
             this.websocket = new WebSocket(this.url);
+            // The server sends binary frames (JSON or MessagePack); receive them as ArrayBuffers
+            this.websocket.binaryType = 'arraybuffer';
             
             this.websocket.onopen = () => {
                 this.connected = true;
@@ -97,17 +100,36 @@ class BGCSWebSocketClient {
                 
                 // Start ping interval
                 this.startPingInterval();
+                
+                // Ask for compact binary state updates when the decoder is loaded
+                if (typeof MessagePack !== 'undefined') {
+                    this.send('subscribe', { encoding: 'msgpack' });
+                }
             };
             
             this.websocket.onmessage = (event) => {
+                let data = event.data;
                 try {
-                    // Handle JSON with potential Infinity and NaN values
-                    let cleanedData = event.data
-                        .replace(/:\s*Infinity/g, ': 1000000')
-                        .replace(/:\s*-Infinity/g, ': -1000000')
-                        .replace(/:\s*NaN/g, ': 0');
-                    
-                    const message = JSON.parse(cleanedData);
+                    let message;
+                    if (data instanceof ArrayBuffer) {
+                        const bytes = new Uint8Array(data);
+                        if (bytes[0] === 0x7B) {
+                            // '{' starts a UTF-8 JSON frame
+                            data = this.textDecoder.decode(bytes);
+                        } else {
+                            // Anything else is a MessagePack-encoded state update
+                            message = MessagePack.decode(bytes);
+                        }
+                    }
+                    if (message === undefined) {
+                        // Handle JSON with potential Infinity and NaN values
+                        let cleanedData = data
+                            .replace(/:\s*Infinity/g, ': 1000000')
+                            .replace(/:\s*-Infinity/g, ': -1000000')
+                            .replace(/:\s*NaN/g, ': 0');
+                        
+                        message = JSON.parse(cleanedData);
+                    }
                     // Only log important messages to reduce console spam
                     if (message.type === 'connection_established' || message.type === 'error') {
                         console.log('📨 WebSocket message received:', message.type, message);
@@ -118,7 +140,7 @@ class BGCSWebSocketClient {
                     
                     // Try to extract message type for debugging
                     try {
-                        const typeMatch = event.data.match(/"type":\s*"([^"]+)"/);
+                        const typeMatch = data.match(/"type":\s*"([^"]+)"/);
                         if (typeMatch && typeMatch[1] === 'state_update') {
                             // State update parsing failed - continue silently
                             return;
@@ -132,7 +154,7 @@ class BGCSWebSocketClient {
                         const handlers = this.messageHandlers.get('parse_error');
                         handlers.forEach(handler => handler({ 
                             error: error.message, 
-                            rawData: event.data.substring(0, 200) 
+                            rawData: typeof data === 'string' ? data.substring(0, 200) : '[binary frame]' 
                         }));
                     }
                 }
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for the API tests.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app, simulation_engine
+from backend.state.manager import state_manager
+
+
+@pytest.fixture
+def api_state():
+    """The module-level StateManager used by the API, cleared around each test."""
+    state_manager.clear_all_state()
+    yield state_manager
+    state_manager.clear_all_state()
+
+
+@pytest.fixture
+def api_engine():
+    return simulation_engine
+
+
+@pytest.fixture
+def client(api_state):
+    # Not used as a context manager, so the startup hook (engine loop) does not run
+    return TestClient(app)
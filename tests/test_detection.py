@@ -0,0 +1,79 @@
+"""
+Behavior tests for the engine's drone/target detection pass.
+"""
+
+import random
+
+from backend.entities.base import Vector3
+from backend.simulation.engine import SimulationEngine
+from backend.state.manager import StateManager
+
+
+def make_engine(seed, drones=15, targets=40):
+    rng = random.Random(seed)
+    manager = StateManager()
+    for i in range(drones):
+        manager.create_entity("drone", f"d{i}", Vector3(rng.uniform(-800, 800), 60, rng.uniform(-800, 800)))
+    for i in range(targets):
+        # Cluster targets around the 200 m cell edges of the spatial index
+        x = rng.choice([-400, -200, 0, 200, 400]) + rng.uniform(-3, 3)
+        z = rng.choice([-400, -200, 0, 200, 400]) + rng.uniform(-3, 3)
+        manager.create_entity("target", f"t{i}", Vector3(x, 0, z))
+    return SimulationEngine(manager), manager, rng
+
+
+def brute_force_detections(manager):
+    drones = manager.get_entities_by_type("drone")
+    return {
+        target.id
+        for target in manager.get_entities_by_type("target")
+        for drone in drones
+        if not drone.destroyed and not target.destroyed
+        and drone.position.distance_squared_to(target.position) <= drone.detection_radius ** 2
+    }
+
+
+def test_index_queries_match_brute_force_after_each_tick():
+    engine, manager, _ = make_engine(1)
+    for _ in range(30):
+        engine._update_entities(1.0 / 60.0)
+        index = manager.get_spatial_index("target")
+        targets = manager.get_entities_by_type("target")
+        for drone in manager.get_entities_by_type("drone"):
+            expected = {
+                t.id for t in targets
+                if t.position.distance_squared_to(drone.position) <= drone.detection_radius ** 2
+            }
+            assert {t.id for t in index.query(drone.position, drone.detection_radius)} == expected
+
+
+def test_detection_uses_positions_from_this_tick():
+    engine, manager, rng = make_engine(2)
+    manager.get_spatial_index("target")  # built from the spawn positions
+
+    # Fast movers jump across cell edges between two detection passes
+    for target in manager.get_entities_by_type("target"):
+        target.position.set(target.position.x + rng.choice([-250, 250]), 0,
+                            target.position.z + rng.choice([-250, 250]))
+
+    engine._update_entities(0.0)
+    expected = brute_force_detections(manager)
+    engine.last_detection_check = 0.0
+    engine._update_detection_system()
+
+    detected = {t.id for t in manager.get_entities_by_type("target") if t.detected}
+    assert detected == expected
+
+
+def test_detection_matches_brute_force_over_many_ticks():
+    for seed in range(5):
+        engine, manager, _ = make_engine(seed)
+        for _ in range(20):
+            engine._update_entities(1.0 / 60.0)
+            expected = brute_force_detections(manager)
+            for target in manager.get_entities_by_type("target"):
+                target.detected = False
+            engine.last_detection_check = 0.0
+            engine._update_detection_system()
+            detected = {t.id for t in manager.get_entities_by_type("target") if t.detected}
+            assert detected == expected
@@ -0,0 +1,70 @@
+"""
+Behavior tests for the per-client WebSocket send queue.
+"""
+
+import asyncio
+
+from backend.api.websocket import ClientSendQueue
+
+
+def drain(queue):
+    async def get_all():
+        return [await queue.get() for _ in range(len(queue))]
+    return asyncio.run(get_all())
+
+
+def test_newer_state_update_replaces_pending_one_in_place():
+    queue = ClientSendQueue(4)
+    queue.put(b"a")
+    queue.put_state(b"state-1")
+    queue.put(b"b")
+    queue.put_state(b"state-2")
+    assert drain(queue) == [b"a", b"state-2", b"b"]
+
+
+def test_full_queue_evicts_pending_state_before_messages():
+    queue = ClientSendQueue(3)
+    queue.put(b"a")
+    queue.put_state(b"state")
+    queue.put(b"b")
+
+    assert queue.put(b"c") is True
+    assert drain(queue) == [b"a", b"b", b"c"]
+
+
+def test_evicted_state_slot_can_be_refilled():
+    queue = ClientSendQueue(2)
+    queue.put_state(b"state-1")
+    queue.put(b"a")
+    queue.put(b"b")  # evicts state-1
+    assert drain(queue) == [b"a", b"b"]
+
+    queue.put_state(b"state-2")
+    assert drain(queue) == [b"state-2"]
+
+
+def test_full_queue_without_state_drops_oldest_message():
+    queue = ClientSendQueue(2)
+    queue.put(b"a")
+    queue.put(b"b")
+
+    assert queue.put(b"c") is False
+    assert drain(queue) == [b"b", b"c"]
+
+
+def test_state_update_is_skipped_when_queue_is_full_of_messages():
+    queue = ClientSendQueue(2)
+    queue.put(b"a")
+    queue.put(b"b")
+    queue.put_state(b"state")
+    assert drain(queue) == [b"a", b"b"]
+
+
+def test_state_eviction_matches_by_identity_not_bytes():
+    queue = ClientSendQueue(3)
+    queue.put(b"same")
+    queue.put_state(b"same")
+    queue.put(b"other")
+
+    queue.put(b"new")
+    assert drain(queue) == [b"same", b"other", b"new"]
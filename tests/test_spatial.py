@@ -0,0 +1,130 @@
+"""
+Behavior tests for the SpatialHash radius index and its StateManager cache.
+"""
+
+import math
+import random
+
+import pytest
+
+from backend.entities.base import Entity, Vector3
+from backend.state.manager import StateManager
+from backend.state.spatial import SpatialHash
+
+
+def make_entities(positions):
+    return [Entity(position=Vector3(x, y, z)) for x, y, z in positions]
+
+
+def brute_force(entities, center, radius):
+    radius_sq = radius * radius
+    return {id(e) for e in entities if e.position.distance_squared_to(center) <= radius_sq}
+
+
+def query_ids(index, center, radius):
+    return {id(e) for e in index.query(center, radius)}
+
+
+def test_query_matches_brute_force():
+    rng = random.Random(42)
+    entities = make_entities(
+        (rng.uniform(-1000, 1000), rng.uniform(0, 100), rng.uniform(-1000, 1000))
+        for _ in range(300)
+    )
+    index = SpatialHash(200.0)
+    index.rebuild(entities)
+
+    for _ in range(200):
+        center = Vector3(rng.uniform(-1200, 1200), rng.uniform(0, 100), rng.uniform(-1200, 1200))
+        radius = rng.choice([0.0, 1.0, 50.0, 199.9, 200.0, 200.1, 450.0, 3000.0])
+        assert query_ids(index, center, radius) == brute_force(entities, center, radius)
+
+
+def test_query_across_cell_boundaries():
+    # Entities sitting exactly on and just either side of the x = 200 / z = 0 cell edges
+    entities = make_entities([(200.0, 0, 0), (199.999, 0, 0), (200.001, 0, -0.001), (0.0, 0, -0.001)])
+    index = SpatialHash(200.0)
+    index.rebuild(entities)
+
+    for center, radius in [(Vector3(199.5, 0, 0), 0.5), (Vector3(200.5, 0, 0), 0.5),
+                           (Vector3(0, 0, 0.5), 0.6), (Vector3(400, 0, 0), 200.0)]:
+        assert query_ids(index, center, radius) == brute_force(entities, center, radius)
+
+
+def test_radius_reaching_exact_distance_is_inclusive():
+    entities = make_entities([(250.0, 0, 0)])
+    index = SpatialHash(200.0)
+    index.rebuild(entities)
+    assert len(index.query(Vector3(0, 0, 0), 250.0)) == 1
+    assert index.query(Vector3(0, 0, 0), 249.99) == []
+
+
+@pytest.mark.parametrize("radius", [math.inf, 1e308, 1e20])
+def test_unbounded_radius_falls_back_to_full_scan(radius):
+    entities = make_entities([(-900, 0, 900), (0, 0, 0), (900, 0, -900)])
+    index = SpatialHash(200.0)
+    index.rebuild(entities)
+    assert len(index.query(Vector3(0, 0, 0), radius)) == 3
+
+
+def test_nan_radius_matches_nothing():
+    index = SpatialHash(200.0)
+    index.rebuild(make_entities([(0, 0, 0), (500, 0, 500)]))
+    assert index.query(Vector3(0, 0, 0), math.nan) == []
+
+
+@pytest.mark.parametrize("center", [Vector3(math.inf, 0, 0), Vector3(0, 0, math.nan)])
+def test_non_finite_center_does_not_raise(center):
+    index = SpatialHash(200.0)
+    index.rebuild(make_entities([(0, 0, 0), (500, 0, 500)]))
+    assert index.query(center, 100.0) == []
+
+
+def test_non_finite_positions_are_not_indexed():
+    entities = make_entities([(math.inf, 0, 0), (0, 0, math.nan), (10, 0, 10)])
+    index = SpatialHash(200.0)
+    index.rebuild(entities)
+    assert index.query(Vector3(0, 0, 0), math.inf) == [entities[2]]
+
+
+def test_empty_index():
+    index = SpatialHash(200.0)
+    index.rebuild([])
+    assert index.query(Vector3(0, 0, 0), math.inf) == []
+
+
+def test_state_manager_index_is_reused_until_tick_or_revision_changes():
+    manager = StateManager()
+    target = manager.create_entity("target", "t1", Vector3(0, 0, 0))
+
+    index = manager.get_spatial_index("target")
+    cells = index.cells
+    assert manager.get_spatial_index("target").cells is cells
+
+    # Moving without a new tick keeps the old buckets ...
+    target.position.set(1000, 0, 1000)
+    assert manager.get_spatial_index("target").cells is cells
+
+    # ... and advancing the tick rebuilds from current positions
+    manager.advance_tick()
+    assert manager.get_spatial_index("target").query(Vector3(1000, 0, 1000), 1.0) == [target]
+
+
+def test_state_manager_index_sees_added_entities():
+    manager = StateManager()
+    manager.create_entity("target", "t1", Vector3(0, 0, 0))
+    assert len(manager.get_spatial_index("target").query(Vector3(0, 0, 0), 10.0)) == 1
+
+    manager.create_entity("target", "t2", Vector3(5, 0, 0))
+    assert len(manager.get_spatial_index("target").query(Vector3(0, 0, 0), 10.0)) == 2
+
+
+def test_update_entities_restamps_index_after_moving():
+    manager = StateManager()
+    target = manager.create_entity("target", "t1", Vector3(0, 0, 0))
+    manager.get_spatial_index("target")
+
+    target.position.set(1000, 0, 1000)
+    manager.update_entities(0.0)
+    position = target.position
+    assert manager.get_spatial_index("target").query(position, 1.0) == [target]
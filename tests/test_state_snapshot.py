@@ -0,0 +1,63 @@
+"""
+Behavior tests for the (tick, revision) keyed state snapshot cache.
+"""
+
+import orjson
+
+from backend.entities.base import Vector3
+from backend.state.manager import StateManager
+
+
+def test_snapshot_is_reused_while_state_is_unchanged():
+    manager = StateManager()
+    manager.create_entity("drone", "d1", Vector3(0, 0, 0))
+
+    snapshot, snapshot_json = manager.get_cached_state_snapshot()
+    assert manager.get_cached_state_snapshot()[0] is snapshot
+    assert manager.get_state_snapshot_json() is snapshot_json
+    assert orjson.loads(snapshot_json) == orjson.loads(orjson.dumps(snapshot))
+
+
+def test_snapshot_is_rebuilt_after_logged_mutation():
+    manager = StateManager()
+    manager.create_entity("drone", "d1", Vector3(0, 0, 0))
+    manager.get_cached_state_snapshot()
+
+    manager.create_entity("target", "t1", Vector3(5, 0, 5))
+    snapshot, _ = manager.get_cached_state_snapshot()
+    assert set(snapshot["entities"]) == {"d1", "t1"}
+
+
+def test_snapshot_is_rebuilt_after_tick():
+    manager = StateManager()
+    drone = manager.create_entity("drone", "d1", Vector3(0, 0, 0))
+    manager.get_cached_state_snapshot()
+
+    drone.position.set(10, 20, 30)
+    manager.advance_tick()
+    snapshot, _ = manager.get_cached_state_snapshot()
+    assert snapshot["entities"]["d1"]["position"] == {"x": 10, "y": 20, "z": 30}
+
+
+def test_snapshot_is_rebuilt_after_order_change():
+    manager = StateManager()
+    manager.create_entity("drone", "d1", Vector3(0, 0, 0))
+    manager.create_entity("drone", "d2", Vector3(0, 0, 0))
+    manager.get_cached_state_snapshot()
+
+    manager.set_entity_order(["d2", "d1"])
+    snapshot, _ = manager.get_cached_state_snapshot()
+    assert snapshot["entities"]["d1"]["sort_index"] == 1
+    assert snapshot["entities"]["d2"]["sort_index"] == 0
+
+
+def test_state_route_reads_its_own_writes(client, api_state):
+    api_state.create_entity("drone", "rw1", Vector3(0, 0, 0))
+    before = client.get("/api/state").json()["state"]
+    assert before["entities"]["rw1"]["waypoints"] == []
+
+    response = client.put("/api/entity/rw1/path", json={"path": [{"x": 5, "y": 6, "z": 7}]})
+    assert response.status_code == 200
+
+    after = client.get("/api/state").json()["state"]
+    assert after["entities"]["rw1"]["waypoints"] == [{"x": 5, "y": 6, "z": 7}]
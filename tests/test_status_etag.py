@@ -0,0 +1,58 @@
+"""
+Behavior tests for /api/status conditional requests.
+"""
+
+import pytest
+
+from backend.api.routes import etag_matches
+from backend.entities.base import Vector3
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ("", False),
+    ('W/"rev-1-2"', True),
+    ('"rev-1-2"', True),
+    ('"other", W/"rev-1-2"', True),
+    ('W/"other",W/"rev-1-2"', True),
+    ("*", True),
+    ('"other"', False),
+    ('W/"rev-1-20"', False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, 'W/"rev-1-2"') is expected
+
+
+def test_status_returns_304_for_current_etag(client):
+    first = client.get("/api/status")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/status", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    listed = client.get("/api/status", headers={"If-None-Match": f'"stale", {etag}'})
+    assert listed.status_code == 304
+
+    assert client.get("/api/status", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_status_etag_changes_with_state(client, api_state):
+    etag = client.get("/api/status").headers["etag"]
+
+    api_state.create_entity("drone", "etag1", Vector3(0, 0, 0))
+    response = client.get("/api/status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["entities"]["total"] == len(api_state.entities)
+
+
+def test_status_etag_changes_with_published_stats(client, api_engine, monkeypatch):
+    etag = client.get("/api/status").headers["etag"]
+
+    monkeypatch.setattr(api_engine, "frame_time_stats", (1.5, 3.0))
+    monkeypatch.setattr(api_engine, "stats_revision", api_engine.stats_revision + 1)
+    response = client.get("/api/status", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["simulation"]["avg_frame_time"] == 1.5